@@ -1,27 +1,29 @@
 def ecef_to_lat_long_h(ecef):
     """
     Inputs:
-        ECEF - vector of position (km)
+        ECEF - vector of position (km), or an (..., 3) array of them
 
     Outputs:
         latitude - radians
         longitude - radians
         h - km
+        each a float, or an array of the leading shape of ECEF
     """
-    from numpy import arctan, arctan2, dot
-    from numpy.linalg import norm
+    from numpy import arctan2, asarray, hypot, sqrt
     from config import r_earth
 
-    x, y, z = ecef
+    ecef = asarray(ecef, dtype=float)
+    x, y, z = ecef[..., 0], ecef[..., 1], ecef[..., 2]
 
     longitude = arctan2(y, x)
-    latitude = arctan(z / norm([x, y]))
-    h = norm(ecef) - r_earth
+    rho = hypot(x, y)
+    latitude = arctan2(z, rho)
+    h = sqrt(rho**2 + z**2) - r_earth
 
     return latitude, longitude, h
 
 def project_ecef_enu(ecef, enu):
-    """Projects an ECEF vector onto a given enu basis
+    """Projects ECEF vectors, [x, y, z] or (..., 3), onto a given enu basis
     """
     from numpy import dot
     e, n, u = enu
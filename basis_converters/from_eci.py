@@ -1,20 +1,42 @@
 def eci_to_ecef_r(R, date):
     """
     Inputs:
-        R - vector of position (km)
+        R - vector of position (km), or an (..., 3) array of them
         date - timedate
 
     Outputs:
-        x - km
-        y - km
-        z - km
+        ecef - [x, y, z] (km), or an (..., 3) array of them
     """
-    from numpy import array, cos, dot, sin
     from basis_converters.rotation import rotate_z
 
-    theta_g = 4.8949608921 + 6.3003880989677574 * calc_d(date)
+    return rotate_z(greenwich_angle(calc_d(date)), R)
+
+def eci_to_ecef_r_times(R, epoch, times):
+    """Rotates a whole track into the ecef basis in one batched operation
+    Inputs:
+        R - an (N, 3) array of positions (km)
+        epoch - datetime of time zero
+        times - an array of N times from epoch (s)
+
+    Outputs:
+        ecef - an (N, 3) array of positions (km)
+    """
+    from numpy import asarray
+    from basis_converters.rotation import rotate_z
+    theta_g = greenwich_angle(calc_d(epoch) + asarray(times, dtype=float) / 86400)
     return rotate_z(theta_g, R)
 
+def greenwich_angle(d):
+    """
+    Calculates the rotation angle of the Earth for a number of days since
+    1st January 12:00, 2000
+    Input:
+        d - days since the base time (float or array)
+    Output:
+        theta_g - radians
+    """
+    return 4.8949608921 + 6.3003880989677574 * d
+
 def calc_d(date):
     """
     Calculates the difference in days between a given date and 1st January 12:00, 2000,
@@ -34,91 +56,113 @@ def eci_to_hcl_basis(eci):
     Computes hcl basis vectors for a spacecraft from a given eci position
 
     Input
-    eci - A tuple of R, V vectors
+    eci - A tuple of R, V vectors, each [x, y, z] or an (..., 3) array, or an
+        (..., 6) array of states
 
     Output
     h, c, l - basis vectors in the height, cross-track, and along-track
-    directions
+    directions, each of the shape of R
     """
-    from numpy import cross
+    from numpy import asarray, cross
     from numpy.linalg import norm
-    R, V = eci
-    h = R / norm(R)
-    c = cross(R, V) / norm(cross(R, V))
+    if isinstance(eci, (tuple, list)):
+        R, V = (asarray(vector, dtype=float) for vector in eci)
+    else:
+        eci = asarray(eci, dtype=float)
+        R, V = eci[..., :3], eci[..., 3:]
+    H = cross(R, V)
+    h = R / norm(R, axis=-1, keepdims=True)
+    c = H / norm(H, axis=-1, keepdims=True)
     l = cross(h, c)
     return h, c, l
 
 def eci_to_kep(position, velocity):
     """
     Input:
-            position - [x, y, z] (km)
-            velocity - [u, v, w] (km/s)
+            position - [x, y, z] (km), or an (..., 3) array of them
+            velocity - [u, v, w] (km/s), or an (..., 3) array of them
     Output:
-        kep - a set of Keplerian elements
+        kep - a set of Keplerian elements, each a float or an array of the
+            leading shape of position
             semi-major-axis (km),
             eccentricity (should be in the range (0, 1)),
             inclination (radians),
             argument of periapsis (radians),
             Right Ascension of Ascending Node (radians),
             True Anomaly (radians)
+
+    Circular orbits (e below eps) have no periapsis, so w is zero and TA is
+    measured from the ascending node. Equatorial orbits have no node, so RA is
+    zero and w is the longitude of periapsis, measured from the x axis, or, if
+    also circular, w is zero and TA is measured from the x axis. Each case is
+    selected per element with a mask
     """
-    from numpy import arccos, cross, dot, inner, pi
-    from numpy.linalg import norm
+    from numpy import arccos, asarray, maximum, minimum, pi, sqrt, where
     from config import mu
     # The acceptable error bound
     eps = 1.e-10
 
-    r = norm(position)
-    v = norm(velocity)
-    vr = inner(position, velocity) / r
-
-    H = cross(position, velocity)
-    h = norm(H)
-
-    incl = arccos(H[2] / h)
-
-    N = cross([0, 0, 1], H)
-    n = norm(N)
-
-    if n != 0:
-        RA = arccos(N[0] / n)
-        if N[1] < 0:
-            RA = 2 * pi - RA
-    else:
-        RA = 0
-
-    E = calc_eccentricity_vec(position, velocity, v, r, vr)
-    e = norm(E)
-
-    if n != 0:
-        if e > eps:
-            w = arccos(dot(N, E) / n / e)
-            if E[2] < 0:
-                w = 2 * pi - w
-        else:
-            w = 0
-    else:
-        w = 0
-
-
-    if e > eps:
-        TA = arccos(dot(E, position) / e / r)
-        if vr < 0:
-            TA = 2 * pi - TA
-    else:
-        cp = cross(N, position)
-        if cp[2] >= 0:
-            TA = arccos(dot(N, position) / n / r)
-        else:
-            TA = 2 * pi - arccos(dot(N, position) / n / r)
-
-    a = h**2 / mu / (1 - e**2)
-    return a, e, incl, w, RA, TA
+    position = asarray(position, dtype=float)
+    velocity = asarray(velocity, dtype=float)
+    x, y, z = position[..., 0], position[..., 1], position[..., 2]
+    v_x, v_y, v_z = velocity[..., 0], velocity[..., 1], velocity[..., 2]
+    r = sqrt(x * x + y * y + z * z)
+    vr = (x * v_x + y * v_y + z * v_z) / r
+
+    # H = position x velocity
+    H_x = y * v_z - z * v_y
+    H_y = z * v_x - x * v_z
+    H_z = x * v_y - y * v_x
+    h2 = H_x * H_x + H_y * H_y + H_z * H_z
+    h = sqrt(h2)
+
+    # N = [0, 0, 1] x H
+    N_x, N_y = -H_y, H_x
+    n = sqrt(N_x * N_x + N_y * N_y)
+
+    # The eccentricity vector, as calc_eccentricity_vec
+    p = (v_x * v_x + v_y * v_y + v_z * v_z - mu / r) / mu
+    q = r * vr / mu
+    E_x = p * x - q * v_x
+    E_y = p * y - q * v_y
+    E_z = p * z - q * v_z
+    e = sqrt(E_x * E_x + E_y * E_y + E_z * E_z)
+
+    equatorial = n <= eps * h
+    circular = e <= eps
+    # Stand in denominators for the masked cases, whose results are discarded
+    n_safe = where(equatorial, 1, n)
+    e_safe = where(circular, 1, e)
+
+    def angle(cos_angle, flip):
+        # The angle of a cosine in [0, 2pi), taking the lower half when flip
+        angle = arccos(minimum(1, maximum(-1, cos_angle)))
+        return where(flip, 2 * pi - angle, angle)
+
+    incl = arccos(minimum(1, maximum(-1, H_z / h)))
+
+    RA = where(equatorial, 0, angle(N_x / n_safe, N_y < 0))
+
+    w = angle((N_x * E_x + N_y * E_y) / (n_safe * e_safe), E_z < 0)
+    # The longitude of periapsis, measured from the x axis in the sense of motion
+    w_equatorial = angle(E_x / e_safe, where(H_z < 0, -E_y, E_y) < 0)
+    w = where(circular, 0, where(equatorial, w_equatorial, w))
+
+    TA_eccentric = angle((E_x * x + E_y * y + E_z * z) / (e_safe * r), vr < 0)
+    TA_circular = angle((N_x * x + N_y * y) / (n_safe * r), N_x * y - N_y * x < 0)
+    # The true longitude, measured from the x axis in the sense of motion
+    TA_equatorial = angle(x / r, (y < 0) != (H_z < 0))
+    TA = where(circular, where(equatorial, TA_equatorial, TA_circular), TA_eccentric)
+
+    a = h2 / mu / (1 - e * e)
+    # Indexing with () turns 0-d results for a single state back into scalars
+    return tuple(asarray(element)[()] for element in (a, e, incl, w, RA, TA))
 
 def calc_eccentricity_vec(position, velocity, v, r, vr):
+    from numpy import asarray
     from config import mu
     p1 = 1 / mu
-    p2 = (v**2 - mu / r) * position
-    p3 = r * vr * velocity
+    p2 = asarray(v**2 - mu / r)[..., None] * position
+    p3 = asarray(r * vr)[..., None] * velocity
     p4 = p2 - p3
     return p1 * p4
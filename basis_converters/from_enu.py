@@ -1,18 +1,23 @@
 def enu_to_ecef(latitude, longitude):
-    """
+    """Returns the ecef x, y and z axes expressed in the topocentric basis
+    centred on latitude, longitude, the rows of the matrix taking enu
+    coordinates to ecef
     Inputs:
-        latitude - radians
-        longitude - radians
+        latitude - radians, a float or an array
+        longitude - radians, a float or an array of the same shape
 
     Outputs:
-        x - km
-        y - km
-        z - km
+        x - [e, n, u]
+        y - [e, n, u]
+        z - [e, n, u]
+        each an (..., 3) array for arrays of latitude, longitude
     """
-    from numpy import array, cos, sin
-    from numpy.linalg import norm
-    x = array[-sin(lat), -cos(lat) * sin(long), cos(lat) * cos(long)]
-    y = array[ cos(lat), -sin(lat) * sin(long), sin(lat) * cos(long)]
-    z = array[      0,           cos(long), sin(long)]
+    from numpy import broadcast_arrays, cos, sin, stack
+    latitude, longitude = broadcast_arrays(latitude, longitude)
+    cos_lat, sin_lat = cos(latitude), sin(latitude)
+    cos_long, sin_long = cos(longitude), sin(longitude)
+    x = stack([-sin_long, -cos_long * sin_lat, cos_long * cos_lat], axis=-1)
+    y = stack([ cos_long, -sin_long * sin_lat, sin_long * cos_lat], axis=-1)
+    z = stack([0 * latitude, cos_lat, sin_lat], axis=-1)
 
     return x, y, z
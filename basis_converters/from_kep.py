@@ -1,7 +1,8 @@
 def kep_to_eci(kepler):
     """
     Input:
-        kepler - a set of Keplerian elements
+        kepler - a set of Keplerian elements, each a float or an array, which
+            are broadcast together, or an (..., 6) array of them
             (semi-major-axis (km),
             eccentricity (should be in the range (0, 1)),
             inclination (radians),
@@ -9,10 +10,14 @@ def kep_to_eci(kepler):
             Right Ascension of Ascending Node (radians),
             True Anomaly (radians) )
     Output:
-        eci - [R, V] position and velocity (km, km/s)
+        eci - [R, V] position and velocity (km, km/s), each [x, y, z] or an
+            (..., 3) array of them
     """
-    from numpy import add, cos, multiply, sin
-    a, e, incl, w, RA, TA = tuple(kepler)
+    from numpy import asarray, cos, moveaxis, ndarray, sin
+    from config import mu
+    if isinstance(kepler, ndarray):
+        kepler = moveaxis(kepler, -1, 0)
+    a, e, incl, w, RA, TA = (asarray(element, dtype=float) for element in kepler)
 
     P, Q = gaussian_vectors(incl, w, RA)
 
@@ -22,7 +27,7 @@ def kep_to_eci(kepler):
     x = r * cos(TA)
     y = r * sin(TA)
 
-    cartesian_position = add(multiply(x, P), multiply(y, Q))
+    cartesian_position = x[..., None] * P + y[..., None] * Q
 
     cosE = x / a + e
     sinE = y / (a * (1 - e**2)**0.5)
@@ -30,21 +35,27 @@ def kep_to_eci(kepler):
     f = (a * mu)**0.5 / r
     g = (1 - e**2)**0.5
 
-    cartesian_velocity = add(multiply(-f * sinE, P), multiply(f * g * cosE, Q))
+    cartesian_velocity = (-f * sinE)[..., None] * P + (f * g * cosE)[..., None] * Q
     return cartesian_position, cartesian_velocity
 
 def gaussian_vectors(incl, w, RA):
-    from numpy import cos, sin
-    P = [
-    cos(RA) * cos(w) - sin(RA) * cos(incl) * sin(w),
-    sin(RA) * cos(w) + cos(RA) * cos(incl) * sin(w),
-    sin(incl) * sin(w)
-    ]
-
-    Q = [
-    -cos(RA) * sin(w) - sin(RA) * cos(incl) * cos(w),
-    cos(RA) * cos(incl) * cos(w) - sin(RA) * sin(w),
-    sin(incl) * cos(w)
-    ]
+    """Returns the unit vectors P, towards periapsis, and Q, 90 degrees ahead of
+    it in the orbital plane, as [x, y, z] or (..., 3) arrays for arrays of
+    elements"""
+    from numpy import broadcast, cos, empty, sin
+    cos_RA, sin_RA = cos(RA), sin(RA)
+    cos_w, sin_w = cos(w), sin(w)
+    cos_incl, sin_incl = cos(incl), sin(incl)
+    shape = broadcast(incl, w, RA).shape + (3,)
+
+    P = empty(shape)
+    P[..., 0] = cos_RA * cos_w - sin_RA * cos_incl * sin_w
+    P[..., 1] = sin_RA * cos_w + cos_RA * cos_incl * sin_w
+    P[..., 2] = sin_incl * sin_w
+
+    Q = empty(shape)
+    Q[..., 0] = -cos_RA * sin_w - sin_RA * cos_incl * cos_w
+    Q[..., 1] = cos_RA * cos_incl * cos_w - sin_RA * sin_w
+    Q[..., 2] = sin_incl * cos_w
 
     return P, Q
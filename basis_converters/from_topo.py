@@ -2,15 +2,21 @@ def lat_long_to_enu(lat, long, ecef):
   """Returns the unit vectors in  East, North and Up directions
   for the topocentric basis centred on latitude, longitude
   Input:
-    lat - radians
-    long - radians
+    lat - radians, a float or an array
+    long - radians, a float or an array of the same shape
     ecef - [x, y, z] (km)
+  Output:
+    e, n, u - each [x, y, z], or an (..., 3) array for arrays of lat, long
   """
-  from numpy import array, cos, sin
+  from numpy import broadcast_arrays, cos, sin, stack
 
-  e = array([-sin(long), cos(long), 0])
-  n = array([-cos(long) * sin(lat), -sin(long) * sin(lat), cos(lat)])
-  u = array([ cos(long) * cos(lat),  sin(long) * cos(lat), sin(lat)])
+  lat, long = broadcast_arrays(lat, long)
+  cos_lat, sin_lat = cos(lat), sin(lat)
+  cos_long, sin_long = cos(long), sin(long)
+
+  e = stack([-sin_long, cos_long, 0 * lat], axis=-1)
+  n = stack([-cos_long * sin_lat, -sin_long * sin_lat, cos_lat], axis=-1)
+  u = stack([ cos_long * cos_lat,  sin_long * cos_lat, sin_lat], axis=-1)
 
   return e, n, u
 
@@ -19,17 +25,21 @@ def lat_long_to_ecef(latitude_longitude):
     latitude (assumes a height of zero)
 
     Input:
-        latitude_longitude - (latitude, longitude) (radians)
+        latitude_longitude - (latitude, longitude) (radians), each a float or
+            an array, or an (..., 2) array of them
     Output:
-        ecef - [x, y, z] (km)
+        ecef - [x, y, z] (km), or an (..., 3) array of them
     """
     from config import r_earth
-    from numpy import array, cos, pi, sin, arctan2, arctan
-    from numpy.linalg import norm
-    latitude, longitude, *_ = latitude_longitude
+    from numpy import broadcast_arrays, cos, ndarray, sin, stack
+    if isinstance(latitude_longitude, ndarray) and latitude_longitude.ndim > 1:
+        latitude, longitude = latitude_longitude[..., 0], latitude_longitude[..., 1]
+    else:
+        latitude, longitude, *_ = latitude_longitude
+    latitude, longitude = broadcast_arrays(latitude, longitude)
 
     x = r_earth * cos(latitude) * cos(longitude)
     y = r_earth * cos(latitude) * sin(longitude)
     z = r_earth * sin(latitude)
 
-    return array([x, y, z])
+    return stack([x, y, z], axis=-1)
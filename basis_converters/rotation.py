@@ -1,18 +1,44 @@
 def rotate_x(angle, vector):
-    from numpy import array, cos, dot, sin
-    R3_x = array([
-      [1,          0,           0],
-      [0,  cos(angle), sin(angle)],
-      [0, -sin(angle), cos(angle)]
-    ])
-    return dot(R3_x, vector)
+    """Rotates vectors about the x axis, broadcasting over leading dimensions
+    Input:
+        angle - radians, a float or an array broadcastable against the leading
+            shape of vector
+        vector - [x, y, z], or an (..., 3) array
+    Output:
+        an (..., 3) array of the rotated vectors
+    """
+    from numpy import asarray, cos, empty, sin
+    vector = asarray(vector, dtype=float)
+    x, y, z = vector[..., 0], vector[..., 1], vector[..., 2]
+    cos_a = cos(angle)
+    sin_a = sin(angle)
+    y_rot = cos_a * y + sin_a * z
+    z_rot = -sin_a * y + cos_a * z
+    rotated = empty(y_rot.shape + (3,))
+    rotated[..., 0] = x
+    rotated[..., 1] = y_rot
+    rotated[..., 2] = z_rot
+    return rotated
 
 
 def rotate_z(angle, vector):
-    from numpy import array, cos, dot, sin
-    R3_z = array([
-      [ cos(angle), sin(angle),  0],
-      [-sin(angle),  cos(angle), 0],
-      [            0,             0, 1]
-    ])
-    return dot(R3_z, vector)
+    """Rotates vectors about the z axis, broadcasting over leading dimensions
+    Input:
+        angle - radians, a float or an array broadcastable against the leading
+            shape of vector
+        vector - [x, y, z], or an (..., 3) array
+    Output:
+        an (..., 3) array of the rotated vectors
+    """
+    from numpy import asarray, cos, empty, sin
+    vector = asarray(vector, dtype=float)
+    x, y, z = vector[..., 0], vector[..., 1], vector[..., 2]
+    cos_a = cos(angle)
+    sin_a = sin(angle)
+    x_rot = cos_a * x + sin_a * y
+    y_rot = -sin_a * x + cos_a * y
+    rotated = empty(x_rot.shape + (3,))
+    rotated[..., 0] = x_rot
+    rotated[..., 1] = y_rot
+    rotated[..., 2] = z
+    return rotated
@@ -0,0 +1,66 @@
+"""
+Benchmarks propogators.kepler.solve_kepler_array against the Newton iteration
+it replaced, for the eccentricities and mean anomaly spans met in propogation.
+
+Run from the repository root with
+    python -m benchmarks.kepler_solver
+"""
+
+def newton_solve_kepler(e, Mi):
+    """The previous array solver, a Newton iteration from Mi (or from pi within
+    the current revolution for e > 0.8) until every residual is below 1e-10"""
+    from numpy import abs, asarray, cos, pi, sin
+    Mi = asarray(Mi, dtype=float)
+    E = Mi - Mi % (2 * pi) + pi if e > 0.8 else Mi.copy()
+    for _ in range(50):
+        residual = E - e*sin(E) - Mi
+        if abs(residual).max(initial=0) <= 1e-10:
+            break
+        E = E - residual / (1 - e*cos(E))
+    return E
+
+def time_solver(solver, e, Mi, repeats=5):
+    """Returns the best wall clock time (s) of repeats calls of solver(e, Mi)"""
+    import time
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        solver(e, Mi)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def max_residual(e, Mi, E):
+    from numpy import abs, sin
+    return abs(E - e*sin(E) - Mi).max()
+
+def benchmark(n=86400, eccentricities=(0.0001, 0.001, 0.01, 0.04, 0.1, 0.5, 0.9, 0.99, 0.999), revolutions=14):
+    """Times both solvers for n mean anomalies spanning the given number of
+    revolutions, one row per eccentricity
+    Output:
+        rows - a list of dicts of e, the time (s) and maximum residual of each solver
+    """
+    from numpy import linspace, pi
+    from propogators.kepler import solve_kepler_array
+    Mi = linspace(0, 2 * pi * revolutions, n)
+    rows = []
+    for e in eccentricities:
+        rows.append({
+            'e': e,
+            'newton_time': time_solver(newton_solve_kepler, e, Mi),
+            'newton_residual': max_residual(e, Mi, newton_solve_kepler(e, Mi)),
+            'solver_time': time_solver(solve_kepler_array, e, Mi),
+            'solver_residual': max_residual(e, Mi, solve_kepler_array(e, Mi)),
+        })
+    return rows
+
+def main():
+    rows = benchmark()
+    print('{:>8} {:>12} {:>12} {:>12} {:>12} {:>8}'.format(
+        'e', 'newton (s)', 'residual', 'solver (s)', 'residual', 'speedup'))
+    for row in rows:
+        print('{e:>8} {newton_time:>12.5f} {newton_residual:>12.2e} {solver_time:>12.5f} '
+            '{solver_residual:>12.2e} {speedup:>8.2f}'.format(
+                speedup=row['newton_time'] / row['solver_time'], **row))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,339 @@
+"""
+Benchmark suite for the propogators, basis converters, visibility, pass
+detection and grid search, driven from data/jason2.json. Each case is timed at
+several problem sizes, the results are written as JSON, and may be compared
+against a stored baseline to flag regressions.
+
+Run from the repository root with
+    python -m benchmarks.suite [--quick] [--output results.json]
+        [--baseline benchmarks/baseline.json] [--threshold 1.5]
+        [--filter substring] [--save-baseline]
+
+The exit status is 1 if any case is slower than threshold times its baseline.
+Baselines are only meaningful on the machine which recorded them, so record
+one (--save-baseline) before comparing on a new machine
+"""
+import functools
+import os
+from config import data_path
+
+spacecraft_file = os.path.join(data_path, 'jason2.json')
+default_baseline = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+# A list of (name, sizes, build) where build(size) returns the function to time
+cases = []
+
+def case(name, sizes):
+    """Registers a benchmark builder, a function of the problem size returning
+    the zero argument function to time"""
+    def register(build):
+        cases.append((name, sizes, build))
+        return build
+    return register
+
+@functools.lru_cache(maxsize=None)
+def spacecraft():
+    from models.spacecraft_state import SpacecraftState
+    with open(spacecraft_file) as f:
+        return SpacecraftState.fromData(f)
+
+@functools.lru_cache(maxsize=None)
+def track(n, dt=10):
+    """Returns Results of n samples of the Keplerian orbit of the spacecraft"""
+    from numpy import arange
+    from models.results import Results
+    from propogators.kepler import propogate_kepler_epochs
+    sc = spacecraft()
+    states = propogate_kepler_epochs(sc.position, sc.velocity, arange(n) * dt)
+    return Results(states, dt, sc._t, 'kep')
+
+def ground_station():
+    from basis_converters.from_degrees import radians
+    from basis_converters.from_topo import lat_long_to_ecef
+    from models.ground_station import GroundStation
+    return GroundStation(lat_long_to_ecef([radians(52.45), radians(0.81)]), 'England')
+
+def stepper(propogator, n, dt=10):
+    """Returns a function applying a stepping propogator n times"""
+    sc = spacecraft()
+    def run():
+        R, V = sc.position, sc.velocity
+        for _ in range(n):
+            R, V = propogator(R, V, dt)
+    return run
+
+@case('propogate/kepler_epochs', [1000, 10000, 100000, 1000000])
+def kepler_epochs(n):
+    from numpy import arange
+    from propogators.kepler import propogate_kepler_epochs
+    sc = spacecraft()
+    times = arange(n) * 10.0
+    return lambda: propogate_kepler_epochs(sc.position, sc.velocity, times)
+
+@case('propogate/kepler_steps', [1000])
+def kepler_steps(n):
+    from propogators.kepler import propogate_kepler
+    return stepper(propogate_kepler, n)
+
+@case('propogate/rk4_monopole', [1000, 10000])
+def rk4_monopole(n):
+    from propogators.rk4_monopole import propogate_rk4
+    return stepper(propogate_rk4, n)
+
+@case('propogate/rk4_j2', [1000, 10000])
+def rk4_j2(n):
+    from propogators.rk4_monopole_j2 import propogate_rk4
+    return stepper(propogate_rk4, n)
+
+@case('propogate/rk4_j2_batch', [1000, 100000, 1000000])
+def rk4_j2_batch(n):
+    from numpy import concatenate, tile
+    from propogators.rk4_monopole_j2 import propogate_rk4_batch
+    sc = spacecraft()
+    states = tile(concatenate((sc.position, sc.velocity)), (n, 1))
+    return lambda: propogate_rk4_batch(states, 10)
+
+@case('propogate/dopri_j2', [1000, 10000, 100000])
+def dopri_j2(n):
+    from numpy import arange
+    from propogators.dormand_prince import propogate_dopri_j2
+    sc = spacecraft()
+    times = arange(n) * 10.0
+    return lambda: propogate_dopri_j2(sc.position, sc.velocity, times)
+
+@case('propogate/yoshida_j2', [1000, 10000])
+def yoshida_j2(n):
+    from numpy import arange
+    from propogators.symplectic import propogate_symplectic
+    sc = spacecraft()
+    times = arange(n) * 10.0
+    return lambda: propogate_symplectic(sc.position, sc.velocity, times, 'yoshida', 2)
+
+@case('solve/kepler_array', [1000, 100000, 1000000])
+def kepler_array(n):
+    from numpy import linspace, pi
+    from propogators.kepler import solve_kepler_array
+    Mi = linspace(0, 2 * pi * n / 600, n)
+    return lambda: solve_kepler_array(0.0008, Mi)
+
+@case('convert/eci_to_ecef_r', [1000, 10000])
+def eci_to_ecef_r(n):
+    from datetime import timedelta
+    from basis_converters.from_eci import eci_to_ecef_r
+    results = track(n)
+    return lambda: [eci_to_ecef_r(R, results.epoch + timedelta(seconds=t))
+        for R, t in zip(results.eci_r, results.times)]
+
+@case('convert/eci_to_ecef_r_times', [1000, 100000, 1000000])
+def eci_to_ecef_r_times(n):
+    from basis_converters.from_eci import eci_to_ecef_r_times
+    results = track(n)
+    return lambda: eci_to_ecef_r_times(results.eci_r, results.epoch, results.times)
+
+@case('convert/ecef_to_lat_long_h', [1000, 10000])
+def ecef_to_lat_long_h(n):
+    from basis_converters.from_ecef import ecef_to_lat_long_h
+    ecef_r = track(n).ecef_r
+    return lambda: [ecef_to_lat_long_h(r) for r in ecef_r]
+
+@case('convert/ecef_to_lat_long_h_array', [1000, 100000, 1000000])
+def ecef_to_lat_long_h_array(n):
+    from basis_converters.from_ecef import ecef_to_lat_long_h
+    ecef_r = track(n).ecef_r
+    return lambda: ecef_to_lat_long_h(ecef_r)
+
+@case('convert/eci_to_kep', [1000, 10000])
+def eci_to_kep(n):
+    from basis_converters.from_eci import eci_to_kep
+    results = track(n)
+    return lambda: [eci_to_kep(R, V) for R, V in zip(results.eci_r, results.eci_v)]
+
+@case('convert/eci_to_kep_array', [1000, 100000, 1000000])
+def eci_to_kep_array(n):
+    from basis_converters.from_eci import eci_to_kep
+    results = track(n)
+    return lambda: eci_to_kep(results.eci_r, results.eci_v)
+
+@case('convert/eci_to_hcl_basis', [1000, 10000])
+def eci_to_hcl_basis(n):
+    from basis_converters.from_eci import eci_to_hcl_basis
+    results = track(n)
+    return lambda: [eci_to_hcl_basis((R, V)) for R, V in zip(results.eci_r, results.eci_v)]
+
+@case('convert/eci_to_hcl_basis_array', [1000, 100000, 1000000])
+def eci_to_hcl_basis_array(n):
+    from basis_converters.from_eci import eci_to_hcl_basis
+    results = track(n)
+    return lambda: eci_to_hcl_basis(results.eci)
+
+@case('visibility/ground_station_visible', [1000, 10000])
+def ground_station_visible(n):
+    gs = ground_station()
+    ecef_r = track(n).ecef_r
+    return lambda: [gs.visible(r) for r in ecef_r]
+
+@case('visibility/elevation_azimuth', [1000, 100000, 1000000])
+def elevation_azimuth(n):
+    gs = ground_station()
+    ecef_r = track(n).ecef_r
+    return lambda: gs.elevation_azimuth(ecef_r)
+
+@case('visibility/network_stations', [10, 100, 1000, 10000])
+def network_stations(n):
+    from numpy import linspace, pi
+    from models.ground_station_network import GroundStationNetwork
+    ecef_r = track(8640).ecef_r
+    network = GroundStationNetwork.from_lat_long(linspace(-pi / 2, pi / 2, n), linspace(-pi, pi, n))
+    return lambda: network.visibility(ecef_r)
+
+@case('passes/pass_times', [1000, 100000, 1000000])
+def pass_times(n):
+    gs = ground_station()
+    results = track(n)
+    results.ecef_r
+    return lambda: gs.pass_times(results)
+
+@case('passes/pass_times_refined', [10000, 100000])
+def pass_times_refined(n):
+    gs = ground_station()
+    results = track(n)
+    results.ecef_r
+    return lambda: gs.pass_times(results, refine=True)
+
+@case('search/grid_search', [10, 100, 1000, 10000])
+def grid_search(n):
+    """The uncached work of a grid search over about n candidates: generating
+    the lattice, computing visibility over a day and choosing two stations"""
+    from numpy import pi
+    from models.ground_station_network import GroundStationNetwork
+    from optimisation_tools.coverage import pack_visibility, select_stations
+    from optimisation_tools.grid_search import ground_station_gs
+    ecef_r = track(8640).ecef_r
+    # The lattice at pi / m has (2m - 1)(m - 1) points
+    m = round((3 + (1 + 8 * n)**0.5) / 4)
+    def run():
+        network = GroundStationNetwork(ground_station_gs(pi / m))
+        select_stations(pack_visibility(network.visibility(ecef_r)), 2)
+    return run
+
+def time_function(function, repeats=5, max_time=2.0):
+    """Returns the best per call wall clock time (s) of function. Each sample
+    loops over enough calls to last at least 0.2 s, so that fast cases are not
+    dominated by timer noise, and sampling stops early once max_time is spent"""
+    import timeit
+    timer = timeit.Timer(function)
+    loops, elapsed = timer.autorange()
+    best = elapsed / loops
+    spent = elapsed
+    for _ in range(repeats - 1):
+        if spent > max_time:
+            break
+        elapsed = timer.timeit(loops)
+        best = min(best, elapsed / loops)
+        spent += elapsed
+    return best
+
+def run(quick=False, pattern=None, repeats=5):
+    """Times every registered case
+    Input:
+        quick - if True only the smallest size of each case is timed
+        pattern - if given only cases whose name contains it are timed
+        repeats - the number of times each case is run, the best being kept
+    Output:
+        a dict of machine details and {'name[size]': seconds} results
+    """
+    import platform
+    import numpy
+    # Freeing a large block raises glibc's mmap threshold. Otherwise this only
+    # happens after the first large case, and the timing of mid-sized arrays
+    # depends on which cases ran before them
+    numpy.ones(2**21)
+    results = {}
+    for name, sizes, build in cases:
+        if pattern is not None and pattern not in name:
+            continue
+        for size in sizes[:1] if quick else sizes:
+            key = '{}[{}]'.format(name, size)
+            results[key] = time_function(build(size), repeats)
+            print('{:<48} {:>12.6f} s'.format(key, results[key]))
+    return {
+        'machine': {
+            'platform': platform.platform(),
+            'processor': platform.processor(),
+            'python': platform.python_version(),
+            'numpy': numpy.__version__,
+        },
+        'results': results,
+    }
+
+def compare(current, baseline, threshold=1.5):
+    """Compares timings against a baseline
+    Input:
+        current - the output of run
+        baseline - the output of run recorded earlier
+        threshold - the ratio of current to baseline time above which a case
+            is a regression
+    Output:
+        rows - a list of (key, baseline seconds or None, current seconds, ratio or None)
+        regressions - the keys of the cases slower than threshold times the baseline
+    """
+    rows = []
+    regressions = []
+    for key, seconds in current['results'].items():
+        reference = baseline['results'].get(key)
+        ratio = None if reference is None else seconds / reference
+        rows.append((key, reference, seconds, ratio))
+        if ratio is not None and ratio > threshold:
+            regressions.append(key)
+    return rows, regressions
+
+def print_comparison(rows, threshold):
+    print('{:<48} {:>12} {:>12} {:>8}'.format('case', 'baseline', 'current', 'ratio'))
+    for key, reference, seconds, ratio in rows:
+        if ratio is None:
+            print('{:<48} {:>12} {:>12.6f} {:>8}'.format(key, '-', seconds, 'new'))
+        else:
+            flag = ' REGRESSION' if ratio > threshold else ''
+            print('{:<48} {:>12.6f} {:>12.6f} {:>8.2f}{}'.format(key, reference, seconds, ratio, flag))
+
+def main(argv=None):
+    import argparse
+    import json
+    import os
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--quick', action='store_true', help='only time the smallest size of each case')
+    parser.add_argument('--filter', default=None, help='only time cases whose name contains this')
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--output', default=None, help='write the results as JSON to this file')
+    parser.add_argument('--baseline', default=default_baseline)
+    parser.add_argument('--threshold', type=float, default=1.5,
+        help='the slowdown relative to the baseline counted as a regression')
+    parser.add_argument('--save-baseline', action='store_true', help='store the results as the baseline')
+    args = parser.parse_args(argv)
+
+    current = run(args.quick, args.filter, args.repeats)
+    if args.output is not None:
+        with open(args.output, 'w') as f:
+            json.dump(current, f, indent=2, sort_keys=True)
+    if args.save_baseline:
+        baseline = {'machine': current['machine'], 'results': {}}
+        if os.path.isfile(args.baseline):
+            with open(args.baseline) as f:
+                baseline['results'] = json.load(f)['results']
+        baseline['results'].update(current['results'])
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        return 0
+    if not os.path.isfile(args.baseline):
+        print('No baseline at {}, record one with --save-baseline'.format(args.baseline))
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    rows, regressions = compare(current, baseline, args.threshold)
+    print_comparison(rows, args.threshold)
+    return 1 if regressions else 0
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(main())
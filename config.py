@@ -9,5 +9,22 @@ r_equatorial = 6378
 r_polar = 6356
 r_earth = (r_equatorial + r_polar) / 2
 
-root_path = os.path.abspath(os.getcwd())
-pickle_path = root_path + '/data/pickle'
+# The reference radius of the gravity model (km), see propogators/gravity.py
+r_reference = 6378.1363
+
+# Paths are relative to this file rather than the working directory, so jobs may
+# be launched from anywhere, and each may be overridden from the environment
+root_path = os.environ.get('SPACE_SIM_ROOT', os.path.dirname(os.path.abspath(__file__)))
+data_path = os.environ.get('SPACE_SIM_DATA', os.path.join(root_path, 'data'))
+pickle_path = os.path.join(data_path, 'pickle')
+land_mask_path = os.environ.get('SPACE_SIM_LAND_MASK', os.path.join(data_path, 'land_mask.npz'))
+# Where the plotters save figures (see plotters/render.py)
+media_path = os.environ.get('SPACE_SIM_MEDIA', os.path.join(root_path, 'docs', 'media'))
+
+# The location and size bound of the result cache (see utils/cache.py). It has a
+# directory of its own, as the cache removes entries on eviction
+cache_path = os.environ.get('SPACE_SIM_CACHE', os.path.join(data_path, 'cache'))
+cache_max_bytes = int(os.environ.get('SPACE_SIM_CACHE_BYTES', 2 * 1024**3))
+
+# Part of every cache key, bump to invalidate results after a change to the models
+model_version = 2
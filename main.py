@@ -1,23 +1,256 @@
-"""Program entry point - import a script from scripts to run a specific task
+"""Program entry point
+
+    python main.py [--profile FILE] [--report] [--report-file FILE] COMMAND [options]
+
+Commands:
+    propagate - propogates a spacecraft with one or more propogators
+    passes - computes the passes of a propogated orbit over ground stations
+    gridsearch - searches for ground station positions with the greatest visibility
+    compare - compares two propogators in the topocentric basis of ground stations
+    render - renders the ground track and pass figures of an orbit headlessly
+
+Run python main.py COMMAND --help for the options of each command. Commands
+only import the modules they need, and plotting libraries are only loaded
+when --plot is given.
+
+--profile runs the command under cProfile, writing the statistics to FILE and
+printing the most expensive calls. --report enables utils.instrumentation and
+prints the phase timings, counters and memory high-water marks, --report-file
+writes them to FILE as JSON instead
 """
-from scripts.generate_data import propogate_kep_rk4
-from models.ground_station import GroundStation
-from scripts.data_processing import compute_passes
-from basis_converters.from_radians import degrees
-from basis_converters.from_degrees import radians
-from plotters.earth_plotter import plot_polar
-
-from validation_tools.orbit_comparison import orbit_difference_topo
-from plotters.time_plotter import time_plot
-
-from plotters.time_plotter import time_series_plot
-kep_vectors, rk4_mono_vectors, rk4_j2_vectors = propogate_kep_rk4('./data/jason2.json', 10, 8640)
-from basis_converters.from_topo import lat_long_to_ecef
-ground_stations = [GroundStation(lat_long_to_ecef([radians(52.45), radians(0.81)]), 'England'),
- GroundStation(lat_long_to_ecef([radians(52.56), radians(117.00)]), 'Russia'),
- GroundStation(lat_long_to_ecef([radians(-64.86), radians(-63.41)]), 'Antartica'),
- GroundStation(lat_long_to_ecef([radians(-45.0), radians(171.0)]), 'New Zealand')]
-
-for gs in ground_stations:
-    differences = orbit_difference_topo(kep_vectors.ecef_r, rk4_mono_vectors.ecef_r, gs)
-    time_plot(differences, 10, "{}_{}_enu".format(kep_vectors.pname, rk4_mono_vectors.pname))
+
+# (name, latitude, longitude) in degrees
+default_stations = [
+    ('England', 52.45, 0.81),
+    ('Russia', 52.56, 117.00),
+    ('Antartica', -64.86, -63.41),
+    ('New Zealand', -45.0, 171.0),
+]
+
+def propogate_command(args):
+    """Propogates the spacecraft with each of the chosen propogators, optionally
+    writing the trajectories to args.output in the trajectory file format"""
+    import os
+    from scripts.generate_data import make_simulator
+    from utils.parallel import run_simulations
+    spacecraft = load_spacecraft(args.spacecraft)
+    results = run_simulations([(make_simulator(name, spacecraft.copy()), args.steps, args.dt)
+        for name in args.propogators or ['kep', 'rk4', 'rk4j2']], args.processes)
+    for orbit in results:
+        print(orbit)
+    if args.output is not None:
+        from utils.trajectory_file import write_results
+        os.makedirs(args.output, exist_ok=True)
+        for orbit in results:
+            write_results(orbit, os.path.join(args.output, orbit.pname + '.trj'))
+    return results
+
+def passes_command(args):
+    """Prints the passes of the propogated orbit over each ground station"""
+    from scripts.data_processing import compute_passes, compute_passes_streaming
+    from scripts.generate_data import make_simulator
+    simulator = make_simulator(args.propogator, load_spacecraft(args.spacecraft))
+    ground_stations = make_ground_stations(args.station)
+    if args.chunk_size is not None:
+        results = compute_passes_streaming(ground_stations, simulator, args.steps, args.dt, args.chunk_size)
+    else:
+        orbit = simulator.propogate_in_period(args.steps, args.dt)
+        results = compute_passes(ground_stations, orbit, args.refine)
+    for gs, passes in results:
+        print('{}: {} passes'.format(gs.name, len(passes)))
+        for (start, _, _), (end, _, _) in passes:
+            print('    {} - {} ({})'.format(start, end, end - start))
+    if args.plot:
+        from plotters.time_plotter import time_series_plot
+        time_series_plot(results)
+    return results
+
+def gridsearch_command(args):
+    """Searches for the ground stations seeing the most of the propogated orbit"""
+    from basis_converters.from_degrees import radians
+    from basis_converters.from_radians import degrees
+    from scripts.generate_data import make_simulator
+    orbit = make_simulator(args.propogator, load_spacecraft(args.spacecraft)).propogate_in_period(args.steps, args.dt)
+    if args.target is not None:
+        from optimisation_tools.grid_search import grid_search_hierarchical
+        search = grid_search_hierarchical(orbit, radians(args.target), radians(args.increment), args.top)
+        for gs, visibility in search:
+            lat, long = map(degrees, gs.lat_long)
+            print(lat, long, len(visibility))
+        plottable_results = [(gs, len(visibility)) for gs, visibility in search]
+        if args.plot:
+            from plotters.plotter2d import plot_gs_vis_2d
+            plot_gs_vis_2d(plottable_results, 'hierarchical_gs')
+        return plottable_results
+
+    from optimisation_tools.grid_search import grid_search_long
+    min_spacing = None if args.min_spacing is None else radians(args.min_spacing)
+    search = grid_search_long(radians(args.increment), orbit, args.k, min_spacing, args.exact)
+    plottable_results = [(gs, len(visibility), color) for gs, visibility, color in search]
+    if args.plot:
+        from plotters.earth_plotter import plot_gs_vis
+        plot_gs_vis(plottable_results, 'ideal_gs')
+    return plottable_results
+
+def compare_command(args):
+    """Prints the largest differences between two propogators in the east,
+    north and up directions of each ground station"""
+    from numpy import abs
+    from scripts.generate_data import make_simulator
+    from utils.parallel import run_simulations
+    from validation_tools.orbit_comparison import orbit_difference_topo
+    spacecraft = load_spacecraft(args.spacecraft)
+    orbita, orbitb = run_simulations([(make_simulator(name, spacecraft.copy()), args.steps, args.dt)
+        for name in args.propogators], args.processes)
+    comparisons = []
+    for gs in make_ground_stations(args.station):
+        differences = orbit_difference_topo(orbita.ecef_r, orbitb.ecef_r, gs)
+        print('{}: max |e| {:.6f} km, max |n| {:.6f} km, max |u| {:.6f} km'.format(gs.name,
+            *abs(differences).max(axis=0)))
+        comparisons.append((gs, differences))
+        if args.plot:
+            from plotters.time_plotter import time_plot
+            time_plot(differences.T, args.dt, "{}_{}_enu".format(orbita.pname, orbitb.pname))
+    return comparisons
+
+def render_command(args):
+    """Renders the ground track and visibility figure of the propogated orbit,
+    and the passes over each ground station, across worker processes with
+    plotters.render"""
+    from models.ground_station_network import GroundStationNetwork
+    from plotters.earth_plotter import plot_ground_tracks_vs_vis, plot_polar
+    from plotters.render import render
+    from scripts.generate_data import make_simulator
+    orbit = make_simulator(args.propogator, load_spacecraft(args.spacecraft)).propogate_in_period(args.steps, args.dt)
+    ground_stations = make_ground_stations(args.station)
+    # Computed once here rather than in each worker
+    visibility = GroundStationNetwork(ground_stations).visibility(orbit.ecef_r)
+    jobs = [(plot_ground_tracks_vs_vis, (orbit, ground_stations, '{}_ground_tracks_vs_vis'.format(orbit.pname)),
+        {'lat_long': orbit.lat_long_h, 'visibility': visibility})]
+    jobs += [(plot_polar, (gs, orbit, '{}_{}'.format(orbit.pname, gs.name)), {'passes': gs.divide_passes(orbit)})
+        for gs in ground_stations]
+    paths = [path for job_paths in render(jobs, args.output, args.processes) for path in job_paths]
+    for path in paths:
+        print(path)
+    return paths
+
+def load_spacecraft(fname):
+    from models.spacecraft_state import SpacecraftState
+    with open(fname) as f:
+        return SpacecraftState.fromData(f)
+
+def make_ground_stations(stations):
+    """Builds GroundStation instances from (name, latitude, longitude) in
+    degrees, default_stations if None"""
+    from basis_converters.from_degrees import radians
+    from basis_converters.from_topo import lat_long_to_ecef
+    from models.ground_station import GroundStation
+    return [GroundStation(lat_long_to_ecef([radians(float(lat)), radians(float(long))]), name)
+        for name, lat, long in stations or default_stations]
+
+def build_parser():
+    import argparse
+    import os
+    from config import data_path
+    # As scripts.generate_data.propogator_names, repeated so that parsing the
+    # arguments imports nothing heavy
+    propogator_names = ('kep', 'rk4', 'rk4j2', 'dopri', 'verlet', 'yoshida')
+
+    def propogator(name):
+        # Checked here rather than with choices, which rejects an empty list
+        if name not in propogator_names:
+            raise argparse.ArgumentTypeError('invalid choice: {!r} (choose from {})'.format(
+                name, ', '.join(propogator_names)))
+        return name
+
+    parser = argparse.ArgumentParser(description='Runs the space simulator',
+        formatter_class=argparse.RawDescriptionHelpFormatter, epilog=__doc__.split('\n\n', 2)[1])
+    parser.add_argument('--profile', metavar='FILE', default=None,
+        help='profile the command with cProfile, writing the statistics to FILE')
+    parser.add_argument('--report', action='store_true',
+        help='print a report of phase timings, counters and memory')
+    parser.add_argument('--report-file', metavar='FILE', default=None,
+        help='write the report to FILE as JSON')
+    commands = parser.add_subparsers(dest='command', metavar='COMMAND')
+    commands.required = True
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--spacecraft', default=os.path.join(data_path, 'jason2.json'),
+        help='the spacecraft state file to propogate (default: %(default)s)')
+    common.add_argument('--dt', type=float, default=10, help='the time step (s, default: %(default)s)')
+    common.add_argument('--steps', type=int, default=8640, help='the number of steps (default: %(default)s)')
+    stations = argparse.ArgumentParser(add_help=False)
+    stations.add_argument('--station', nargs=3, action='append', metavar=('NAME', 'LAT', 'LONG'),
+        help='a ground station, in degrees, may be repeated (default: four preset stations)')
+    plot = argparse.ArgumentParser(add_help=False)
+    plot.add_argument('--plot', action='store_true', help='plot the results')
+
+    propogate = commands.add_parser('propagate', aliases=['propogate'], parents=[common],
+        help='propogate a spacecraft')
+    propogate.add_argument('propogators', nargs='*', type=propogator, metavar='PROPOGATOR',
+        help='one or more of {} (default: kep rk4 rk4j2)'.format(', '.join(propogator_names)))
+    propogate.add_argument('--processes', type=int, default=None, help='the number of worker processes')
+    propogate.add_argument('--output', default=None, help='write the trajectories to this directory')
+    propogate.set_defaults(handler=propogate_command)
+
+    passes = commands.add_parser('passes', parents=[common, stations, plot],
+        help='compute passes over ground stations')
+    passes.add_argument('--propogator', choices=propogator_names, default='rk4j2')
+    passes.add_argument('--refine', action='store_true', help='refine pass times between steps')
+    passes.add_argument('--chunk-size', type=int, default=None,
+        help='stream the propogation in chunks of this many states')
+    passes.set_defaults(handler=passes_command)
+
+    gridsearch = commands.add_parser('gridsearch', parents=[common, plot],
+        help='search for ground station positions')
+    gridsearch.add_argument('--propogator', choices=propogator_names, default='kep')
+    gridsearch.add_argument('--increment', type=float, default=9,
+        help='the lattice spacing (degrees, default: %(default)s)')
+    gridsearch.add_argument('--k', type=int, default=2, help='the stations chosen per hemisphere')
+    gridsearch.add_argument('--min-spacing', type=float, default=None,
+        help='the minimum angle between chosen stations (degrees)')
+    gridsearch.add_argument('--exact', action='store_true', help='find the optimal rather than a greedy choice')
+    gridsearch.add_argument('--target', type=float, default=None,
+        help='refine coarse to fine down to this spacing (degrees) instead')
+    gridsearch.add_argument('--top', type=int, default=8, help='the candidates kept at each refinement')
+    gridsearch.set_defaults(handler=gridsearch_command)
+
+    compare = commands.add_parser('compare', parents=[common, stations, plot],
+        help='compare two propogators')
+    compare.add_argument('propogators', nargs=2, choices=propogator_names, metavar='PROPOGATOR',
+        help='two of {}'.format(', '.join(propogator_names)))
+    compare.add_argument('--processes', type=int, default=None, help='the number of worker processes')
+    compare.set_defaults(handler=compare_command)
+
+    render = commands.add_parser('render', parents=[common, stations],
+        help='render figures without a display')
+    render.add_argument('--propogator', choices=propogator_names, default='rk4j2')
+    render.add_argument('--output', default=None,
+        help='the directory figures are saved to (default: config.media_path)')
+    render.add_argument('--processes', type=int, default=None, help='the number of worker processes')
+    render.set_defaults(handler=render_command)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    report = args.report or args.report_file is not None
+    if report:
+        from utils import instrumentation
+        instrumentation.enable(trace_memory=True)
+    if args.profile is not None:
+        import cProfile
+        import pstats
+        profiler = cProfile.Profile()
+        profiler.runcall(args.handler, args)
+        profiler.dump_stats(args.profile)
+        pstats.Stats(profiler).sort_stats('cumulative').print_stats(25)
+    else:
+        args.handler(args)
+
+    if args.report_file is not None:
+        instrumentation.write_report(args.report_file)
+    elif report:
+        instrumentation.print_report()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+class ConstellationSimulator:
+    """Wrapper class to run a batched orbital propogator against a constellation
+    of spacecraft, advancing the states of every spacecraft together each step
+    """
+    def __init__(self, spacecrafts, propogator, pname, grid=False):
+        """
+        Input:
+            spacecrafts - a list of SpacecraftState instances
+            propogator - either a batched stepping function ((N, 6) states, dt) ->
+                (N, 6) states, or when grid is True a function (R, V, times) ->
+                (M, 6) states which is called for each spacecraft in turn
+            pname - the name of the propogator, used for saving and plotting
+            grid - True if the propogator computes the whole time grid in one call
+        """
+        self._spacecrafts = list(spacecrafts)
+        self._pname = pname
+        self._propogator = propogator
+        self._grid = grid
+
+    def propogate_in_period(self, n, dt):
+        """Propogates every spacecraft the requested number of times
+        Output:
+            results - a list of Results, one per spacecraft in order
+        """
+        from models.results import Results
+        from utils.instrumentation import count, timer
+        with timer('propogate'):
+            if self._grid:
+                states = self._propogate_grid(n, dt)
+            else:
+                states = self._propogate_steps(n, dt)
+        count('states_propogated', len(self._spacecrafts) * (n + 1))
+        return [Results(spacecraft_states, dt, spacecraft._t, self._pname)
+            for spacecraft, spacecraft_states in zip(self._spacecrafts, states)]
+
+    def _propogate_steps(self, n, dt):
+        from numpy import empty
+        # Laid out (spacecraft, step, state) so each spacecraft's states are contiguous
+        states = empty((len(self._spacecrafts), n + 1, 6))
+        for index, spacecraft in enumerate(self._spacecrafts):
+            states[index, 0, :3] = spacecraft.position
+            states[index, 0, 3:] = spacecraft.velocity
+        for i in range(1, n + 1):
+            states[:, i] = self._propogator(states[:, i - 1], dt)
+        return states
+
+    def _propogate_grid(self, n, dt):
+        from numpy import arange
+        times = arange(n + 1) * dt
+        return [self._propogator(spacecraft.position, spacecraft.velocity, times)
+            for spacecraft in self._spacecrafts]
@@ -1,3 +1,6 @@
+# The minimum elevation above the horizon at which a satellite is visible (radians)
+min_elevation = 0.0872665
+
 class GroundStation():
     """Encapsulates a ground station, provided access methods as well as a visibility
     function for parsing ECEF entries to check for visibility"""
@@ -52,55 +55,169 @@ class GroundStation():
         return angle, azimuth
 
 
-    def pass_times(self, results):
+    def elevation_azimuth(self, track):
+        """Calculates the elevation and azimuth of every point of a satellite
+        track from the ground station in one pass
+        Input:
+            track - an (N, 3) array of positions in ecef (km)
+        Output:
+            elevation - an array of N angles (radians)
+            azimuth - an array of N angles (radians)
+        """
+        from numpy import arcsin, arctan2, array, asarray
+        from numpy.linalg import norm
+        from utils.instrumentation import timer
+
+        with timer('visibility'):
+            r_ss = asarray(track, dtype=float) - self._ecef
+            r_ss_enu = r_ss @ array([self._e, self._n, self._u]).T
+            r_ss_norm = norm(r_ss, axis=1)
+
+            elevation = arcsin(r_ss_enu[:, 2] / r_ss_norm)
+            azimuth = arctan2(r_ss_enu[:, 0], r_ss_enu[:, 1])
+        return elevation, azimuth
+
+    def pass_indices(self, elevation):
+        """Finds passes by edge detection on the visibility of an array of
+        elevations. Passes still in progress at the end of the data are dropped
+
+        Input:
+            elevation - an array of N angles (radians)
+
+        Output:
+            starts - indices of the first visible point of each pass
+            ends - indices of the first point after each pass which is not visible
+        """
+        from numpy import concatenate, diff, flatnonzero
+        visible = (elevation - min_elevation > 0).astype(int)
+        edges = diff(concatenate(([0], visible)))
+        starts = flatnonzero(edges == 1)
+        ends = flatnonzero(edges == -1)
+        return starts[:len(ends)], ends
+
+    def pass_times(self, results, refine=False):
         """Calculates pass times, as well as azimuth and elevation for the given pass times from a given
         set of orbital results
 
         Input:
             results - an instance of results
+            refine - if True the start and end of each pass are refined to the
+                horizon crossing between the bracketing samples (see refine_crossing),
+                otherwise they are reported at the propogation step
 
         Output:
             passes - a list of tuples with the following structure: ((pass_begin), (pass_end))
             pass_start - a tuple (time, elevation, azimuth) recording the start of the pass
             pass_end - a tuple (time, elevation, azimuth) recording the end of the pass
         """
-        from datetime import datetime, timedelta
-        ecef_data = results.ecef_r
+        from datetime import timedelta
+        from utils.instrumentation import count, timer
+        elevation, azimuth = self.elevation_azimuth(results.ecef_r)
         passes = []
-        start = 0
-        end = 0
-        run = False
-        for index, point in enumerate(ecef_data):
-            if self.visible(point) and run is False:
-                start = results.epoch + timedelta(0, results.delta * index)
-                start_elevation, start_azimuth = self.angle_and_azimuth(point)
-                run = True
-            if self.visible(point) is not True and run is True:
-                end = results.epoch + timedelta(0, results.delta * index)
-                end_elevation, end_azimuth = self.angle_and_azimuth(point)
-                passes.append(((start, start_elevation, start_azimuth), (end, end_elevation, end_azimuth)))
-                run = False
-        return(passes)
+        with timer('passes'):
+            starts, ends = self.pass_indices(elevation)
+            for start, end in zip(starts, ends):
+                start_pass = (results.times[start], elevation[start], azimuth[start])
+                end_pass = (results.times[end], elevation[end], azimuth[end])
+                if refine:
+                    # A pass in progress at the first sample has no bracketing interval
+                    if start > 0:
+                        start_pass = self.refine_crossing(results, start - 1)
+                    end_pass = self.refine_crossing(results, end - 1)
+                passes.append(tuple((results.epoch + timedelta(0, float(time)), angle, azimuth)
+                    for time, angle, azimuth in (start_pass, end_pass)))
+        count('passes', len(passes))
+        return passes
+
+    def chunk_passes(self, results, start_pass=None):
+        """Calculates the passes completed within one chunk of a stream of results,
+        carrying a pass which is still in progress over to the next chunk
+
+        Input:
+            results - an instance of results holding one chunk
+            start_pass - the (time, elevation, azimuth) start of a pass in progress
+                at the end of the previous chunk, or None
+
+        Output:
+            passes - a list of passes completed in the chunk, as for pass_times
+            start_pass - the start of a pass in progress at the end of the chunk, or None
+        """
+        from datetime import timedelta
+        from numpy import concatenate, diff, flatnonzero
+        from utils.instrumentation import count
+        elevation, azimuth = self.elevation_azimuth(results.ecef_r)
+        visible = elevation - min_elevation > 0
+        edges = diff(concatenate(([start_pass is not None], visible)).astype(int))
+        passes = []
+        for index in flatnonzero(edges):
+            point = (results.epoch + timedelta(0, float(results.times[index])),
+                elevation[index], azimuth[index])
+            if edges[index] == 1:
+                start_pass = point
+            else:
+                passes.append((start_pass, point))
+                start_pass = None
+        count('passes', len(passes))
+        return passes, start_pass
+
+    def stream_passes(self, chunks):
+        """Yields passes as they complete from a stream of results chunks (see
+        Simulator.propogate_chunks), holding only one chunk at a time. Passes are
+        reported at the propogation step, as for pass_times without refinement
+        """
+        start_pass = None
+        for results in chunks:
+            passes, start_pass = self.chunk_passes(results, start_pass)
+            yield from passes
+
+    def refine_crossing(self, results, index):
+        """Finds the time at which the satellite crosses the visibility threshold
+        between the samples at index and index + 1 by root finding on states
+        interpolated from the stored results, rather than re-propogating at a
+        smaller step
+
+        Input:
+            results - an instance of results
+            index - the index of the sample before the crossing
+
+        Output:
+            (time, elevation, azimuth) - time from epoch (s), radians, radians
+        """
+        from scipy.optimize import brentq
+        from basis_converters.from_eci import eci_to_ecef_r_times
+
+        def track(time):
+            state = results.interpolate([time])
+            return eci_to_ecef_r_times(state[:, :3], results.epoch, [time])
+
+        def elevation_above_threshold(time):
+            elevation, _ = self.elevation_azimuth(track(time))
+            return elevation[0] - min_elevation
+
+        time = brentq(elevation_above_threshold, results.times[index], results.times[index + 1],
+            xtol=1e-6)
+        elevation, azimuth = self.elevation_azimuth(track(time))
+        return time, elevation[0], azimuth[0]
 
     def divide_passes(self, results):
+        """Splits the ecef track of a set of orbital results into the visible
+        segments of each pass
+
+        Input:
+            results - an instance of results
+
+        Output:
+            passes - a list of (M, 3) arrays of ecef positions (km), one per pass
+        """
         ecef_data = results.ecef_r
-        passes = []
-        run = False
-        for index, point in enumerate(ecef_data):
-            if self.visible(point) and run is False:
-                cur_list = [point]
-                run = True
-            if self.visible(point) and run is True:
-                cur_list.append(point)
-            if self.visible(point) is not True and run is True:
-                passes.append(cur_list)
-                run = False
-        return passes
+        elevation, _ = self.elevation_azimuth(ecef_data)
+        starts, ends = self.pass_indices(elevation)
+        return [ecef_data[start:end] for start, end in zip(starts, ends)]
 
     def visible(self, satellite_ecef):
         """Checks if an ecef position is visible
         """
         angle, _ = self.angle_and_azimuth(satellite_ecef)
-        if angle - 0.0872665 > 0:
+        if angle - min_elevation > 0:
             return True
         return False
@@ -0,0 +1,94 @@
+class GroundStationNetwork:
+    """Stacks the positions and enu bases of a set of ground stations into arrays,
+    so that elevations and visibility can be computed for every station against
+    every sample of a track with batched matrix products"""
+    def __init__(self, ground_stations):
+        from numpy import array, einsum
+        self._ground_stations = list(ground_stations)
+        self._positions = array([gs.position for gs in self._ground_stations], dtype=float).reshape(-1, 3)
+        self._enu = array([gs.enu for gs in self._ground_stations], dtype=float).reshape(-1, 3, 3)
+        self._up = self._enu[:, 2]
+        # Terms of the station-satellite geometry which depend on the stations only
+        self._up_offsets = einsum('ij,ij->i', self._up, self._positions)
+        self._position_norms = einsum('ij,ij->i', self._positions, self._positions)
+
+    @classmethod
+    def from_lat_long(cls, latitudes, longitudes, names=None):
+        """Builds a network from arrays of latitudes and longitudes (radians)"""
+        from models.ground_station import GroundStation
+        from basis_converters.from_topo import lat_long_to_ecef
+        if names is None:
+            names = [str(index) for index in range(len(latitudes))]
+        positions = lat_long_to_ecef((latitudes, longitudes)).reshape(-1, 3)
+        return cls([GroundStation(position, name) for position, name in zip(positions, names)])
+
+    @property
+    def ground_stations(self):
+        return self._ground_stations
+
+    @property
+    def positions(self):
+        return self._positions
+
+    @property
+    def enu(self):
+        return self._enu
+
+    def __len__(self):
+        return len(self._ground_stations)
+
+    def sin_elevation_chunks(self, track, max_elements=2**22):
+        """Calculates the sine of the elevation of every sample from every station,
+        processing the track in chunks of time to bound memory
+        Input:
+            track - an (N, 3) array of positions in ecef (km)
+            max_elements - the maximum size of each stations x samples chunk
+        Output:
+            yields (start, sin_elevation) where sin_elevation is a
+                (stations, chunk) array for the samples from start onwards
+        """
+        from numpy import asarray, einsum, sqrt
+        track = asarray(track, dtype=float).reshape(-1, 3)
+        chunk_size = max(1, max_elements // max(1, len(self)))
+        for start in range(0, len(track), chunk_size):
+            chunk = track[start:start + chunk_size]
+            # |r - p|^2 = |p|^2 - 2 p.r + |r|^2 and u.(r - p) = u.r - u.p
+            distances = (self._position_norms[:, None] - 2 * (self._positions @ chunk.T) +
+                einsum('ij,ij->i', chunk, chunk)[None, :])
+            up = self._up @ chunk.T - self._up_offsets[:, None]
+            yield start, up / sqrt(distances)
+
+    def elevation(self, track, max_elements=2**22):
+        """Calculates the elevation (radians) of every sample from every station
+        as a (stations, N) array"""
+        from numpy import arcsin, empty
+        from utils.instrumentation import timer
+        elevation = empty((len(self), len(track)))
+        with timer('visibility'):
+            for start, sin_elevation in self.sin_elevation_chunks(track, max_elements):
+                elevation[:, start:start + sin_elevation.shape[1]] = arcsin(sin_elevation)
+        return elevation
+
+    def visibility(self, track, max_elements=2**22):
+        """Calculates a (stations, N) boolean array, True where a sample is visible
+        from a station"""
+        from numpy import empty, sin
+        from models.ground_station import min_elevation
+        from utils.instrumentation import timer
+        visibility = empty((len(self), len(track)), dtype=bool)
+        with timer('visibility'):
+            for start, sin_elevation in self.sin_elevation_chunks(track, max_elements):
+                visibility[:, start:start + sin_elevation.shape[1]] = sin_elevation > sin(min_elevation)
+        return visibility
+
+    def visible_counts(self, track, max_elements=2**22):
+        """Calculates the number of visible samples for each station without
+        holding the full visibility matrix"""
+        from numpy import sin, zeros
+        from models.ground_station import min_elevation
+        from utils.instrumentation import timer
+        counts = zeros(len(self), dtype=int)
+        with timer('visibility'):
+            for _, sin_elevation in self.sin_elevation_chunks(track, max_elements):
+                counts += (sin_elevation > sin(min_elevation)).sum(axis=1)
+        return counts
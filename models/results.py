@@ -1,11 +1,42 @@
 class Results:
     """Encapsulates a set of results, provided access methods for transforming
-    data safely"""
-    def __init__(self, vectors, delta, epoch, pname):
-        self._vectors = vectors
+    data safely. The states are held in a single contiguous (n + 1, 6) array
+    of x, y, z (km), u, v, w (km/s), alongside a column of times (s) from epoch
+    """
+    __slots__ = ('_states', '_times', '_delta', '_epoch', '_pname', '_ecef_r')
+
+    # Derived data is recomputed on demand rather than pickled
+    _cached = ('_ecef_r',)
+
+    def __init__(self, states, delta, epoch, pname, times=None):
+        from numpy import arange, ascontiguousarray
+        self._states = ascontiguousarray(states, dtype=float)
+        self._states.flags.writeable = False
+        if times is None:
+            times = arange(len(self._states)) * delta
+        self._times = ascontiguousarray(times, dtype=float)
+        self._times.flags.writeable = False
         self._delta = delta
         self._epoch = epoch
         self._pname = pname
+        self._ecef_r = None
+
+    def __getstate__(self):
+        return {name: getattr(self, name) for name in self.__slots__ if name not in self._cached}
+
+    def __setstate__(self, state):
+        """Restores pickled state, including pickles written before Results was
+        array backed (which stored a list of (R, V) tuples under _vectors)"""
+        from numpy import arange, array
+        if '_vectors' in state:
+            state = dict(state)
+            vectors = state.pop('_vectors')
+            state['_states'] = array([list(r) + list(v) for r, v in vectors], dtype=float)
+            state['_times'] = arange(len(vectors), dtype=float) * state['_delta']
+        for name in self.__slots__:
+            setattr(self, name, state.get(name))
+        self._states.flags.writeable = False
+        self._times.flags.writeable = False
 
     @property
     def pname(self):
@@ -15,22 +46,61 @@ class Results:
     def epoch(self):
         return self._epoch
 
+    @property
+    def times(self):
+        """Returns the time of each state from epoch (s)"""
+        return self._times
 
     @property
     def eci(self):
-        return self._vectors
+        """Returns the (n + 1, 6) array of states in the eci basis (km, km/s)"""
+        return self._states
 
     @property
     def eci_r(self):
-        return [r for r, _ in self.eci]
+        """Returns a view of the eci positions (km)"""
+        return self._states[:, :3]
+
+    @property
+    def eci_v(self):
+        """Returns a view of the eci velocities (km/s)"""
+        return self._states[:, 3:]
 
     @property
     def ecef_r(self):
-        """Returns a copy of the primary data list, mapped to the ecef bases (km)"""
-        from datetime import datetime, timedelta
-        from basis_converters.from_eci import eci_to_ecef_r
-        times = [self._epoch + timedelta(0, self._delta * i) for i in range(len(self.eci_r))]
-        return [eci_to_ecef_r(vector, time) for vector, time in zip(self.eci_r, times)]
+        """Returns the positions mapped to the ecef basis (km) as a read-only
+        (n + 1, 3) array, computed on first access and shared thereafter"""
+        from basis_converters.from_eci import eci_to_ecef_r_times
+        from utils.instrumentation import timer
+        if self._ecef_r is None:
+            with timer('frame_conversion'):
+                self._ecef_r = eci_to_ecef_r_times(self.eci_r, self._epoch, self._times)
+            self._ecef_r.flags.writeable = False
+        return self._ecef_r
+
+    def interpolate(self, times):
+        """Interpolates states at arbitrary times from epoch using cubic Hermite
+        interpolation between the positions and velocities of the bracketing
+        samples. The velocities are the derivative of the interpolated positions
+        Input:
+            times - an array of M times from epoch (s)
+        Output:
+            states - an (M, 6) array of x, y, z (km), u, v, w (km/s)
+        """
+        from numpy import asarray, clip, empty, searchsorted
+        times = asarray(times, dtype=float)
+        index = clip(searchsorted(self._times, times, side='right') - 1, 0, len(self._times) - 2)
+        h = (self._times[index + 1] - self._times[index])[:, None]
+        s = ((times - self._times[index]) / h[:, 0])[:, None]
+        r0, v0 = self.eci_r[index], self.eci_v[index]
+        r1, v1 = self.eci_r[index + 1], self.eci_v[index + 1]
+
+        states = empty((len(times), 6))
+        states[:, :3] = ((2 * s**3 - 3 * s**2 + 1) * r0 + (s**3 - 2 * s**2 + s) * h * v0 +
+            (-2 * s**3 + 3 * s**2) * r1 + (s**3 - s**2) * h * v1)
+        states[:, 3:] = ((6 * s**2 - 6 * s) * (r0 - r1) / h + (3 * s**2 - 4 * s + 1) * v0 +
+            (3 * s**2 - 2 * s) * v1)
+        return states
 
     @property
     def delta(self):
@@ -38,22 +108,22 @@ class Results:
 
     @property
     def lat_long_h(self):
-        """Returns a copy of the primary data list, mapped to latitudes and longitudes (radians)"""
+        """Returns an (N, 3) array of the latitudes, longitudes (radians) and
+        heights (km) of the track"""
+        from numpy import column_stack
         from basis_converters.from_ecef import ecef_to_lat_long_h
-        return list(map(ecef_to_lat_long_h, self.ecef_r))
+        from utils.instrumentation import timer
+        ecef_r = self.ecef_r
+        with timer('frame_conversion'):
+            return column_stack(ecef_to_lat_long_h(ecef_r))
+
+    def __len__(self):
+        return len(self._states)
+
+    def cache_key(self):
+        """Identifies the results by their full contents when used as a cache
+        parameter (see utils.cache.canonical)"""
+        return [self._pname, self._delta, self._epoch, self._states, self._times]
 
     def __str__(self):
-        """Important for saving and loading functionality, uses md5"""
-        import hashlib
-        print(str(self._pname) +
-        str(len(self._vectors) - 1) +
-        str(self._delta) +
-        str(self._vectors[0][0]) +
-        str(self._vectors[0][1]))
-        key = (
-            str(self._pname) +
-            str(len(self._vectors) - 1) +
-            str(self._delta) +
-            str(self._vectors[0][0]) +
-            str(self._vectors[0][1]))
-        return hashlib.md5(key.encode()).hexdigest()
+        return 'Results({}, {} states, delta={})'.format(self._pname, len(self._states), self._delta)
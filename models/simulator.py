@@ -2,41 +2,98 @@ class Simulator:
     """Wrapper class to run orbital propogator against a given spacecraft for
     a defined step
     """
-    def __init__(self, spacecraft, propogator, pname):
+    def __init__(self, spacecraft, propogator, pname, grid=False, closed_form=False):
+        """
+        Input:
+            spacecraft - a SpacecraftState instance
+            propogator - either a stepping function (R, V, dt) -> (Rdt, Vdt), or
+                when grid is True a function (R, V, times) -> (N, 6) states
+            pname - the name of the propogator, used for saving and plotting
+            grid - True if the propogator computes the whole time grid in one call
+            closed_form - True if the grid propogator evaluates any time directly
+                (as propogate_kepler_epochs), so that chunks may be computed
+                from the epoch rather than continued from the previous chunk
+        """
         self._spacecraft = spacecraft
         self._pname = pname
         self._propogator = propogator
+        self._grid = grid
+        self._closed_form = closed_form
 
     def propogate_in_period(self, n, dt):
         """Checks to see if results exist, otherwise propogates the requested
         number of times
         """
         from models.results import Results
+        from utils.instrumentation import count, timer
         from utils.save_load import save, load
-        key = self.save_key(n, dt)
-        data = load(['propogate_in_period', key])
+        params = self.cache_params(n, dt)
+        data = load(params)
         if data is not None:
             return data
 
-        vectors = [(self._spacecraft.position, self._spacecraft.velocity)]
+        with timer('propogate'):
+            if self._grid:
+                states = self._propogate_grid(n, dt)
+            else:
+                states = self._propogate_steps(n, dt)
+        count('states_propogated', len(states))
+        data = Results(states, dt, self._spacecraft._t, self._pname)
+        save(params, data)
+        return data
+
+    def propogate_chunks(self, n, dt, chunk_size=8640):
+        """Propogates the requested number of times, yielding the states as they
+        are produced in Results of at most chunk_size states, so that memory does
+        not grow with n. The times of each chunk are from the spacecraft epoch.
+        Each chunk continues from the last state of the previous one, so the
+        cost is linear in n, unless the propogator is closed form. Chunks are
+        not cached
+        """
+        from numpy import arange, concatenate, empty
+        from models.results import Results
+        from utils.instrumentation import count, timer
         position = self._spacecraft.position
         velocity = self._spacecraft.velocity
+        state = concatenate((position, velocity))
+        for start in range(0, n + 1, chunk_size):
+            times = arange(start, min(start + chunk_size, n + 1)) * dt
+            with timer('propogate'):
+                if self._grid and (self._closed_form or start == 0):
+                    states = self._propogator(position, velocity, times)
+                elif self._grid:
+                    # From the last state of the previous chunk, at a relative
+                    # time of zero, which is dropped
+                    relative = arange(len(times) + 1) * dt
+                    states = self._propogator(state[:3], state[3:], relative)[1:]
+                else:
+                    states = empty((len(times), 6))
+                    for i in range(len(times)):
+                        if start + i > 0:
+                            state = concatenate(self._propogator(state[:3], state[3:], dt))
+                        states[i] = state
+            state = states[-1].copy()
+            count('states_propogated', len(states))
+            yield Results(states, dt, self._spacecraft._t, self._pname, times=times)
+
+    def _propogate_steps(self, n, dt):
+        from numpy import empty
+        states = empty((n + 1, 6))
+        states[0, :3] = self._spacecraft.position
+        states[0, 3:] = self._spacecraft.velocity
         for i in range(1, n + 1):
-            # Generates the base propogation series and freezes the values
-            vector = self._propogator(vectors[i - 1][0], vectors[i - 1][1], dt)
-            for item in vector:
-                item.flags.writeable = False
-            vectors.append(vector)
-        data = Results(vectors, dt, self._spacecraft._t, self._pname)
-        save(['propogate_in_period', key], data)
-        return data
+            # Generates the base propogation series into the preallocated states
+            states[i, :3], states[i, 3:] = self._propogator(states[i - 1, :3], states[i - 1, 3:], dt)
+        return states
+
+    def _propogate_grid(self, n, dt):
+        from numpy import arange
+        return self._propogator(self._spacecraft.position,
+            self._spacecraft.velocity, arange(n + 1) * dt)
 
-    def save_key(self, n, dt):
-        import hashlib
-        key = (
-            str(self._pname) +
-            str(n) +
-            str(dt) +
-            str(self._spacecraft.position) +
-            str(self._spacecraft.velocity))
-        return hashlib.md5(key.encode()).hexdigest()
+    def cache_params(self, n, dt):
+        """Returns the parameters identifying a propogation in the result cache,
+        including the propogator itself so that its code version is part of the key"""
+        spacecraft = self._spacecraft
+        return ['propogate_in_period', self._pname, self._propogator, self._grid, n, dt,
+            spacecraft.position, spacecraft.velocity, spacecraft._t]
@@ -0,0 +1,103 @@
+"""
+Coverage of sample indices by candidate ground stations, stored as packed bitsets
+so that unions and intersections of visibility are bytewise operations and
+coverage is a popcount
+"""
+
+def pack_visibility(visibility):
+    """Packs a (stations, N) boolean visibility matrix into a (stations, ceil(N / 8))
+    array of bitsets over sample indices"""
+    from numpy import asarray, packbits
+    return packbits(asarray(visibility, dtype=bool), axis=-1)
+
+def popcount(bits):
+    """Counts the set bits along the last axis of an array of bitsets"""
+    import numpy
+    if hasattr(numpy, 'bitwise_count'):
+        return numpy.bitwise_count(bits).sum(axis=-1, dtype=int)
+    return _popcount_table()[bits].sum(axis=-1, dtype=int)
+
+def select_stations(bits, k, allowed=None, lat_long=None, min_spacing=None, exact=False):
+    """Selects up to k stations maximising the number of samples visible to at
+    least one of them
+
+    Input:
+        bits - a (stations, M) array of packed visibility (see pack_visibility)
+        k - the number of stations to select
+        allowed - a boolean array marking the stations which may be chosen
+            (for example a hemisphere), all stations if None
+        lat_long - a (stations, 2) array of latitudes and longitudes (radians),
+            required by min_spacing
+        min_spacing - the minimum angle between any two chosen stations (radians)
+        exact - if True the optimal set is found by branch and bound, which is
+            practical for small k, otherwise stations are chosen greedily by
+            the number of samples each adds
+
+    Output:
+        chosen - a list of station indices, in order of selection
+        coverage - the number of samples visible to the chosen stations
+    """
+    from numpy import asarray, ones, zeros
+    bits = asarray(bits)
+    allowed = ones(len(bits), dtype=bool) if allowed is None else asarray(allowed, dtype=bool).copy()
+    if min_spacing is not None and lat_long is None:
+        raise ValueError('min_spacing requires the lat_long of each station')
+    covered = zeros(bits.shape[1:], dtype=bits.dtype)
+    chosen = []
+    if exact:
+        chosen, _ = _branch_and_bound(bits, k, allowed, lat_long, min_spacing, covered, [], 0, ([], 0))
+        for index in chosen:
+            covered |= bits[index]
+            allowed &= _spaced(index, lat_long, min_spacing, len(bits))
+            allowed[index] = False
+
+    # Completes the exact set when stations past the optimum add nothing (or no
+    # station sees any sample), so that k stations are chosen either way
+    for _ in range(k - len(chosen)):
+        if not allowed.any():
+            break
+        gains = popcount(bits & ~covered)
+        gains[~allowed] = -1
+        best = int(gains.argmax())
+        chosen.append(best)
+        covered |= bits[best]
+        allowed &= _spaced(best, lat_long, min_spacing, len(bits))
+        allowed[best] = False
+    return chosen, int(popcount(covered))
+
+def _branch_and_bound(bits, k, allowed, lat_long, min_spacing, covered, chosen, coverage, best):
+    """Searches combinations of the allowed stations, pruning any branch whose
+    best possible completion (the sum of the largest marginal gains, an upper
+    bound since coverage is submodular) cannot beat the best set found so far"""
+    from numpy import argsort, flatnonzero
+    if len(chosen) == k or not allowed.any():
+        return (list(chosen), coverage) if coverage > best[1] else best
+    candidates = flatnonzero(allowed)
+    gains = popcount(bits[candidates] & ~covered)
+    order = argsort(-gains, kind='stable')
+    candidates, gains = candidates[order], gains[order]
+    remaining = k - len(chosen)
+    for position, (candidate, gain) in enumerate(zip(candidates, gains)):
+        if coverage + gains[position:position + remaining].sum() <= best[1]:
+            break
+        # Later stations are only combined with those after them in this order
+        later = allowed.copy()
+        later[candidates[:position + 1]] = False
+        later &= _spaced(candidate, lat_long, min_spacing, len(bits))
+        best = _branch_and_bound(bits, k, later, lat_long, min_spacing, covered | bits[candidate],
+            chosen + [int(candidate)], coverage + int(gain), best)
+    return best
+
+def _spaced(index, lat_long, min_spacing, n_stations):
+    """Marks the stations at least min_spacing from the station at index"""
+    from numpy import arccos, asarray, clip, cos, ones, sin
+    if min_spacing is None:
+        return ones(n_stations, dtype=bool)
+    latitudes, longitudes = asarray(lat_long, dtype=float).T
+    cos_angle = (sin(latitudes) * sin(latitudes[index]) +
+        cos(latitudes) * cos(latitudes[index]) * cos(longitudes - longitudes[index]))
+    return arccos(clip(cos_angle, -1, 1)) >= min_spacing
+
+def _popcount_table():
+    from numpy import arange, unpackbits, uint8
+    return unpackbits(arange(256, dtype=uint8)[:, None], axis=1).sum(axis=1)
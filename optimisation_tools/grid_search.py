@@ -5,137 +5,157 @@ def ground_station_gs(increment):
         Where values are separated by the value of increment.
     """
     from models.ground_station import GroundStation
-    from numpy import arange, pi
+    from numpy import arange, meshgrid, pi
     from basis_converters.from_topo import lat_long_to_ecef
-    index = 0
-    ground_stations = []
-    for longitude in arange(-pi + increment, pi, increment):
-        for latitude in arange(-pi / 2 + increment, pi / 2, increment):
-            ground_stations.append(GroundStation(lat_long_to_ecef([latitude,
-              longitude]), str(index)))
-            index += 1
-    return ground_stations
+    # Latitude varies fastest, as the candidates are numbered
+    longitudes, latitudes = meshgrid(arange(-pi + increment, pi, increment),
+      arange(-pi / 2 + increment, pi / 2, increment), indexing='ij')
+    positions = lat_long_to_ecef((latitudes, longitudes)).reshape(-1, 3)
+    return [GroundStation(position, str(index)) for index, position in enumerate(positions)]
 
 def grid_search(increment, data):
     """Generates candidates using ground_station_gs then from generated candidates
     the input data is filtered for visibility.
 
-        Returns a list of [GroundStation, Visibility], where Visibility is in the
-        ECEF_R basis
+        Returns a list of [GroundStation, Visibility], where Visibility is an
+        array of the visible points in the ECEF_R basis
     """
-    from basis_converters.from_ecef import ecef_to_lat_long_h
-    from basis_converters.from_radians import degrees
+    from models.ground_station_network import GroundStationNetwork
+    from utils.instrumentation import count
     from utils.save_load import save, load
 
-    results = load(['grid_search', increment, data])
+    results = load(['grid_search', grid_search, increment, data])
     if results is not None:
         return results
 
     ground_stations = ground_station_gs(increment)
-    results = []
-    for gs in ground_stations:
-        visible = [x for x in data.ecef_r if gs.visible(x)]
-        lat, long = gs.lat_long
-        print("{}, {}".format(degrees(lat), degrees(long)))
-        results.append((gs, visible))
-
-    save(['grid_search', increment, data], results)
+    ecef_r = data.ecef_r
+    visibility = GroundStationNetwork(ground_stations).visibility(ecef_r)
+    results = [(gs, ecef_r[visible_mask]) for gs, visible_mask in zip(ground_stations, visibility)]
+    count('grid_candidates', len(results))
+
+    save(['grid_search', grid_search, increment, data], results)
+    return results
+
+def grid_search_hierarchical(data, target_increment, increment=None, top_k=8):
+    """Conducts a coarse to fine grid search. The lattice of ground_station_gs is
+    evaluated at increment and the top_k candidates by visibility are kept. The
+    increment is then repeatedly halved, evaluating only the 3x3 neighbourhood of
+    each kept candidate at the new spacing, until it reaches target_increment.
+    As with any coarse to fine search a narrow optimum missed by the coarse
+    lattice is not recovered, increasing top_k trades cost for robustness.
+
+        Returns a list of [GroundStation, Visibility] for the top_k candidates at the
+        final resolution, ordered by visibility, where Visibility is an array of the
+        visible points in the ECEF_R basis
+    """
+    from numpy import arange, argsort, array, meshgrid, pi, round, unique
+    from models.ground_station_network import GroundStationNetwork
+    from utils.save_load import save, load
+    increment = pi / 20 if increment is None else increment
+    params = ['grid_search_hierarchical', grid_search_hierarchical, target_increment,
+        increment, top_k, data]
+    results = load(params)
+    if results is not None:
+        return results
+
+    ecef_r = data.ecef_r
+    longitudes, latitudes = meshgrid(arange(-pi + increment, pi, increment),
+        arange(-pi / 2 + increment, pi / 2, increment), indexing='ij')
+    latitudes, longitudes = latitudes.ravel(), longitudes.ravel()
+    while True:
+        network = GroundStationNetwork.from_lat_long(latitudes, longitudes)
+        best = argsort(-network.visible_counts(ecef_r), kind='stable')[:top_k]
+        latitudes, longitudes = latitudes[best], longitudes[best]
+        if increment <= target_increment:
+            break
+
+        # Refines the lattice around each kept candidate
+        increment /= 2
+        latitude_offsets, longitude_offsets = meshgrid([-increment, 0, increment], [-increment, 0, increment])
+        latitudes = (latitudes[:, None] + latitude_offsets.ravel()).ravel()
+        longitudes = (longitudes[:, None] + longitude_offsets.ravel()).ravel()
+        longitudes = (longitudes + pi) % (2 * pi) - pi
+        inside = abs(latitudes) < pi / 2
+        # Neighbourhoods of adjacent candidates overlap, so repeated points are removed
+        _, first = unique(round(array([latitudes, longitudes]) / increment)[:, inside],
+            axis=1, return_index=True)
+        latitudes, longitudes = latitudes[inside][sorted(first)], longitudes[inside][sorted(first)]
+
+    network = GroundStationNetwork.from_lat_long(latitudes, longitudes)
+    results = [(gs, ecef_r[visible]) for gs, visible in
+        zip(network.ground_stations, network.visibility(ecef_r))]
+    save(params, results)
     return results
 
 def filter_candidates(candidates):
-    """Looks up each candidate based on longitude and latitude using Nominatim
-    and filters out candidates which aren't over land (returns None for the address)
+    """Classifies every candidate as over land or sea in one lookup against the
+    bundled land mask, and filters out candidates which aren't over land
 
     Returns a list of [(GroundStation, Visibility, Color)], where color='r', in
     preparation for grid_search_long
     """
-    import time
-    from geopy.geocoders import Nominatim
-    from basis_converters.from_radians import degrees
-    geolocator = Nominatim()
-
-    filtered_candidates = []
-    for index, (gs, visible) in enumerate(candidates):
-        lat, long = gs.lat_long
-        try:
-            time.sleep(1)
-            lookup = geolocator.reverse("{}, {}".format(degrees(lat), degrees(long)))
-            if lookup.address is not None:
-                print("{}, {} - {}".format(degrees(lat), degrees(long), lookup.address))
-                filtered_candidates.append((gs, visible))
-            else:
-                print("{}, {} - Not Found".format(degrees(lat), degrees(long)))
-        except Exception as e:
-            print(e)
+    from numpy import array
+    from optimisation_tools.land_mask import is_land
+    if not candidates:
+        return [], []
+    latitudes, longitudes = array([gs.lat_long for gs, _ in candidates]).T
+    land = is_land(latitudes, longitudes)
+    filtered_candidates = [candidate for candidate, over_land in zip(candidates, land) if over_land]
     # Also sets all points to 'r' in preparation for Grid Search
     northern_hemisphere = [(gs, visible, 'r') for gs, visible in filtered_candidates if gs.lat_long[0] > 0]
     southern_hemisphere = [(gs, visible, 'r') for gs, visible in filtered_candidates if gs.lat_long[0] <= 0]
     return northern_hemisphere, southern_hemisphere
 
-def grid_search_long(increment, data):
-    """Conducts a two phase grid search, generating candidates using grid_search,
-    and then filtering out candidates over water. The candidates are divided into
+def grid_search_long(increment, data, k=2, min_spacing=None, exact=False):
+    """Conducts a grid search, generating candidates using grid_search, and then
+    filtering out candidates over water. The candidates are divided into
     Northern and Souther hemispheres.
 
-    In the first phase the candidate ground station with the greatest visibility in
-    each hemisphere is chosen. In the second phase the search space is reduced by
-    removing points visible from the candidates chosen in the first phase, and then
-    two further ground stations are selected based on the number of points visible.
+    In each hemisphere k ground stations are then chosen to maximise the number of
+    points visible to at least one of them (see coverage.select_stations), by
+    default greedily: the candidate with the greatest visibility first, then the
+    candidate adding the most points not already covered, and so on.
+
+    Input:
+        increment - the lattice spacing of the candidates (radians)
+        data - a Results instance
+        k - the number of ground stations to choose in each hemisphere
+        min_spacing - the minimum angle between chosen stations (radians), if any
+        exact - if True the optimal k stations are found rather than a greedy choice
 
     Returns a list of [(GroundStation, Visibility, Color)], where for chosen candidates
     Color='g' (Green), and all other candidates Color='r'
     """
-    from basis_converters.from_topo import lat_long_to_ecef
+    from numpy import array
+    from basis_converters.from_radians import degrees
+    from models.ground_station_network import GroundStationNetwork
+    from optimisation_tools.coverage import pack_visibility, select_stations
     from utils.save_load import save, load
-    from operator import itemgetter
-    hemispheres = load(['filtered_grid_search', increment, data])
+    hemispheres = load(['filtered_grid_search', filter_candidates, increment, data])
     if hemispheres is None:
         candidates = grid_search(increment, data)
         hemispheres = filter_candidates(candidates)
-        save(['filtered_grid_search', increment, data], hemispheres)
-    # Find the best candidate in both the Northern and Southern hemisphere
-    maximums = [[], []]
-    for hemisphere_index, hemisphere in enumerate(hemispheres):
-        items = [len(visible) for _, visible, _ in hemisphere]
-        index, _ = max(enumerate(items), key=itemgetter(1))
-        maximums[hemisphere_index].append(index)
-
-    # Find the second best ground station in each hemisphere after filtering out points
-    # visible to the first station
-    for hemisphere_index, hemisphere in enumerate(hemispheres):
-        reduced_hemisphere = []
-        best_gs, _, _ = hemisphere[maximums[hemisphere_index][0]]
-        for item_index, (_, visibility, _) in enumerate(hemisphere):
-            # Don't add the previous best candidate
-            if item_index == maximums[hemisphere_index][0]:
-                continue
-            filtered_visiblity = [point for point in visibility if best_gs.visible(point) is False]
-            reduced_hemisphere.append(len(filtered_visiblity))
-
-        index, _ = max(enumerate(reduced_hemisphere), key=itemgetter(1))
-        if index >= maximums[hemisphere_index][0]:
-            # Adjust for the removed list element (the best candidate)
-            index += 1
-        maximums[hemisphere_index].append(index)
-
-    for hemisphere_index, hemisphere in enumerate(maximums):
-        for maximum in hemisphere:
-            gs, visibility, _ = hemispheres[hemisphere_index][maximum]
-            hemispheres[hemisphere_index][maximum] = (gs, visibility, 'g')
-            print(len(visibility))
+        save(['filtered_grid_search', filter_candidates, increment, data], hemispheres)
+    hemispheres = [list(hemisphere) for hemisphere in hemispheres]
+
+    ecef_r = data.ecef_r
+    for hemisphere in hemispheres:
+        if not hemisphere:
+            continue
+        ground_stations = [gs for gs, _, _ in hemisphere]
+        bits = pack_visibility(GroundStationNetwork(ground_stations).visibility(ecef_r))
+        lat_long = array([gs.lat_long for gs in ground_stations])
+        chosen, _ = select_stations(bits, k, lat_long=lat_long, min_spacing=min_spacing, exact=exact)
+        for index in chosen:
+            gs, visibility, _ = hemisphere[index]
+            hemisphere[index] = (gs, visibility, 'g')
 
     # Flatten hemispheres since there's no further need to divide the search
     hemispheres = [item for sublist in hemispheres for item in sublist]
     for gs, visibility, c in hemispheres:
-        from basis_converters.from_radians import degrees
         if c=='g':
             lat, long = map(degrees, gs.lat_long)
             print(lat, long, len(visibility))
 
-
     return hemispheres
-
-
-
-
-    save(['filtered_grid_search', increment, data], hemispheres)
@@ -0,0 +1,37 @@
+"""
+Offline land/sea classification from the low resolution land mask raster bundled
+at config.land_mask_path (see scripts/generate_land_mask.py)
+"""
+import functools
+
+def is_land(latitudes, longitudes):
+    """Classifies points as over land or sea in one vectorised lookup
+    Input:
+        latitudes - an array of latitudes (radians)
+        longitudes - an array of longitudes (radians)
+    Output:
+        land - a boolean array, True where the point is over land
+    """
+    from numpy import asarray, clip, degrees, floor
+    mask, resolution = load_land_mask()
+    rows, columns = mask.shape
+    latitudes = degrees(asarray(latitudes, dtype=float))
+    longitudes = degrees(asarray(longitudes, dtype=float))
+    row = clip(floor((90 - latitudes) / resolution).astype(int), 0, rows - 1)
+    column = floor((longitudes + 180) / resolution).astype(int) % columns
+    return mask[row, column]
+
+@functools.lru_cache(maxsize=None)
+def load_land_mask(fname=None):
+    """Loads and unpacks the land mask raster
+    Output:
+        mask - a (rows, columns) boolean array, rows from latitude 90 to -90 and
+            columns from longitude -180 to 180
+        resolution - the cell size (degrees)
+    """
+    from numpy import load, unpackbits
+    from config import land_mask_path
+    with load(land_mask_path if fname is None else fname) as data:
+        rows, columns = data['shape']
+        mask = unpackbits(data['mask'], axis=1, count=columns).astype(bool)
+        return mask, float(data['resolution'])
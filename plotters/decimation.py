@@ -0,0 +1,147 @@
+"""
+Reduces the series drawn by the plotters. A figure cannot show more than a
+few points per pixel column, so long tracks are decimated before plotting with
+methods which keep their visible shape, and ground tracks are split where they
+cross the antimeridian so that no line is drawn across the map. Only numpy is
+needed, so these may be used (and tested) without matplotlib
+"""
+
+# The default number of points kept per plotted series, a few per pixel column
+# of the figures in plotters
+default_max_points = 4000
+
+def lttb(xs, ys, max_points=default_max_points):
+    """Largest Triangle Three Buckets (Steinarsson, 2013). The first and last
+    points are kept, the rest are split into max_points - 2 buckets, and from
+    each bucket the point forming the largest triangle with the point kept
+    from the previous bucket and the mean of the next bucket is kept
+    Input:
+        xs - an array of N increasing x values
+        ys - an array of N y values
+        max_points - the number of points to keep
+    Output:
+        indices - an increasing array of the indices of the kept points
+    """
+    from numpy import abs, add, arange, asarray, diff, empty, linspace
+    xs = asarray(xs, dtype=float)
+    ys = asarray(ys, dtype=float)
+    n = len(ys)
+    if n <= max_points or max_points < 3:
+        return arange(n)
+    # Bucket b holds the points edges[b]:edges[b + 1], excluding the first and last
+    edges = linspace(1, n - 1, max_points - 1).astype(int)
+    # The mean of each bucket, and of the last point standing in for the bucket
+    # after the final one
+    sizes = diff(edges)
+    mean_xs = add.reduceat(xs[:n - 1], edges[:-1]) / sizes
+    mean_ys = add.reduceat(ys[:n - 1], edges[:-1]) / sizes
+    mean_xs = list(mean_xs[1:]) + [xs[-1]]
+    mean_ys = list(mean_ys[1:]) + [ys[-1]]
+
+    indices = empty(max_points, dtype=int)
+    indices[0] = 0
+    indices[-1] = n - 1
+    a = 0
+    for bucket in range(max_points - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        # Twice the area of the triangles, up to sign
+        areas = abs((xs[a] - mean_xs[bucket]) * (ys[start:end] - ys[a]) -
+            (xs[a] - xs[start:end]) * (mean_ys[bucket] - ys[a]))
+        a = start + areas.argmax()
+        indices[bucket + 1] = a
+    return indices
+
+def min_max_buckets(ys, max_points=default_max_points):
+    """Splits a series into max_points / 2 buckets of consecutive points and
+    keeps the smallest and largest of each, so that the envelope of the series,
+    and every peak, is drawn as it would be in full
+    Input:
+        ys - an array of N y values
+        max_points - the largest number of points to keep
+    Output:
+        indices - an increasing array of the indices of the kept points
+    """
+    from numpy import arange, asarray, concatenate, full, inf, unique
+    ys = asarray(ys, dtype=float)
+    n = len(ys)
+    if n <= max_points or max_points < 4:
+        return arange(n)
+    size = -(-n // (max_points // 2))
+    rows = -(-n // size)
+    # The last bucket is padded with values which are never the min or max
+    lows = full(rows * size, inf)
+    highs = full(rows * size, -inf)
+    lows[:n] = ys
+    highs[:n] = ys
+    offsets = arange(rows) * size
+    return unique(concatenate((
+        [0, n - 1],
+        offsets + lows.reshape(rows, size).argmin(axis=1),
+        offsets + highs.reshape(rows, size).argmax(axis=1))))
+
+def grid_thin(xs, ys, cell):
+    """Keeps one point in each cell of a square grid, for scatter plots whose
+    markers would otherwise be drawn over each other
+    Input:
+        xs, ys - arrays of N coordinates
+        cell - the side of a grid cell, in the units of xs and ys
+    Output:
+        indices - an increasing array of the indices of the kept points
+    """
+    from numpy import asarray, floor, sort, stack, unique
+    xs = asarray(xs, dtype=float)
+    ys = asarray(ys, dtype=float)
+    if len(xs) == 0:
+        return asarray([], dtype=int)
+    cells = stack((floor(xs / cell), floor(ys / cell)), axis=1)
+    _, first = unique(cells, axis=0, return_index=True)
+    return sort(first)
+
+def split_antimeridian(longitudes, latitudes, period=360.0):
+    """Breaks a track where it wraps around the antimeridian. Each wrap is
+    replaced by a point on the edge of the map, a NaN, which matplotlib leaves
+    a gap at, and a point on the opposite edge, the latitude of both being
+    interpolated at the crossing
+    Input:
+        longitudes - an array of N longitudes in (-period / 2, period / 2]
+        latitudes - an array of N latitudes
+        period - 360 for degrees, 2pi for radians
+    Output:
+        longitudes, latitudes - the split arrays
+    """
+    from numpy import abs, asarray, copysign, diff, full_like, insert, nan, nonzero, repeat, stack
+    longitudes = asarray(longitudes, dtype=float)
+    latitudes = asarray(latitudes, dtype=float)
+    wraps = nonzero(abs(diff(longitudes)) > period / 2)[0]
+    if len(wraps) == 0:
+        return longitudes, latitudes
+    long_1, long_2 = longitudes[wraps], longitudes[wraps + 1]
+    lat_1, lat_2 = latitudes[wraps], latitudes[wraps + 1]
+    edge = copysign(period / 2, long_1)
+    # The second longitude continued past the edge of the map
+    fraction = (edge - long_1) / (long_2 + 2 * edge - long_1)
+    lat_edge = lat_1 + fraction * (lat_2 - lat_1)
+
+    positions = repeat(wraps + 1, 3)
+    gaps = full_like(edge, nan)
+    return (insert(longitudes, positions, stack((edge, gaps, -edge), axis=1).ravel()),
+        insert(latitudes, positions, stack((lat_edge, gaps, lat_edge), axis=1).ravel()))
+
+def ground_track(lat_long, max_points=default_max_points):
+    """Prepares a ground track for plotting on a map
+    Input:
+        lat_long - an (N, 2) or (N, 3) array of latitudes and longitudes
+            (radians), as Results.lat_long_h
+        max_points - the number of points to keep, see lttb
+    Output:
+        longitudes, latitudes - arrays in degrees, decimated and split at the
+            antimeridian
+    """
+    from numpy import arange, asarray
+    from basis_converters.from_radians import degrees
+    lat_long = asarray(lat_long, dtype=float)
+    latitudes = degrees(lat_long[:, 0])
+    longitudes = degrees(lat_long[:, 1])
+    # Longitude changes steadily along a track, so the shape is in the latitude
+    indices = lttb(arange(len(latitudes)), latitudes, max_points)
+    return split_antimeridian(longitudes[indices], latitudes[indices])
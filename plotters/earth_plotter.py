@@ -1,65 +1,82 @@
-from mpl_toolkits.basemap import Basemap, cm
-import matplotlib.pyplot as plt
-import numpy
+from plotters.decimation import default_max_points
+from plotters.render import finish
+from utils.instrumentation import timed
 
-def ground_tracks_3(orbits):
+@timed('plotting')
+def ground_tracks_3(orbits, lat_longs=None, max_points=default_max_points, name=None):
     """Plots data from a number or Results instances onto maps, organised by row
     Input:
         orbits - an arbitrary length list of Results
+        lat_longs - optionally the lat_long_h of each orbit, if already computed
+        max_points - the number of points drawn per track (see decimation.lttb)
+        name - if given the name of the output file
     Output:
-        A visualisation, which is shown to the user
+        A visualisation, which is shown to the user, and saved to
+        {media_path}/{name}.png if named
     """
-    from basis_converters.from_eci import eci_to_kep
-    from basis_converters.from_radians import degrees
+    import matplotlib.pyplot as plt
+    from plotters.decimation import ground_track
+    if lat_longs is None:
+        lat_longs = [orbit.lat_long_h for orbit in orbits]
     fig = plt.figure()
-    for i, orbit in enumerate(orbits):
+    for i, (orbit, lat_long) in enumerate(zip(orbits, lat_longs)):
         sp = fig.add_subplot(1, len(orbits), i + 1)
         m = init_projection()
-        lists = list(zip(*orbit.lat_long_h))
-        latitudes = list(map(degrees, lists[0]))
-        longitudes = list(map(degrees, lists[1]))
-        xs, ys = m(longitudes, latitudes)
+        xs, ys = m(*ground_track(lat_long, max_points))
         sp.set_title(orbit.pname)
         m.plot(xs, ys)
     plt.subplots_adjust(hspace=0.3)
-    plt.show()
+    finish(name)
 
-def plot_ground_tracks_vs_vis(results, ground_stations, name):
+@timed('plotting')
+def plot_ground_tracks_vs_vis(results, ground_stations, name, lat_long=None, visibility=None,
+        max_points=default_max_points, dpi=300):
     """Superimposes visible points onto ground tracks
     Input:
         results - an instance of a Result object
         ground_stations - a list of ground_stations with which to filter the results
         name - the name for the output file
+        lat_long - optionally results.lat_long_h, if already computed
+        visibility - optionally the (stations, N) visibility of the results from
+            each ground station (see GroundStationNetwork.visibility), if
+            already computed
+        max_points - the number of points drawn of the track (see decimation.lttb)
+        dpi - the resolution of the saved figure
     Output:
-        A visualisation, which is saved to './docs/media/{name}.png'
+        A visualisation, which is saved to {media_path}/{name}.png
     """
-    from basis_converters.from_ecef import ecef_to_lat_long_h
+    import matplotlib.pyplot as plt
     from basis_converters.from_radians import degrees
+    from models.ground_station_network import GroundStationNetwork
+    from plotters.decimation import grid_thin, ground_track
 
-    # Unwrap values and convert to degrees for basemap
-    latitudes, longitudes, _ = list(zip(*results.lat_long_h))
-
-    latitudes = list(map(degrees, latitudes))
-    longitudes = list(map(degrees, longitudes))
+    if lat_long is None:
+        lat_long = results.lat_long_h
+    if visibility is None:
+        visibility = GroundStationNetwork(ground_stations).visibility(results.ecef_r)
+    # Convert to degrees for basemap
+    latitudes = degrees(lat_long[:, 0])
+    longitudes = degrees(lat_long[:, 1])
 
     m = init_projection()
 
-    xs, ys = m(longitudes, latitudes)
-    m.plot(xs, ys, 'bo', markersize=1, color='k')
-    handles = []
-    for gs, c in zip(ground_stations, ['r', 'g', 'b', 'sienna']):
+    xs, ys = m(*ground_track(lat_long, max_points))
+    m.plot(xs, ys, linewidth=0.5, color='k')
+    # Visible points closer than a marker are drawn once
+    cell = 360 / max_points
+    for gs, visible, c in zip(ground_stations, visibility, ['r', 'g', 'b', 'sienna']):
         gsy, gsx = gs.lat_long
         gs_m_x, gs_m_y = m(degrees(gsx), degrees(gsy))
         m.plot(gs_m_x, gs_m_y, 'bo', markersize=10, color=c, label=gs.name)
-        points = [ecef_to_lat_long_h(point) for point in results.ecef_r if gs.visible(point)]
-        lats, longs = zip(*[(degrees(lats), degrees(longs)) for lats, longs, _ in points])
-        lats_m, longs_m = m(lats, longs)
-        m.plot(longs_m, lats_m, 'bo', markersize=1, color=c)
+        visible_longitudes, visible_latitudes = longitudes[visible], latitudes[visible]
+        kept = grid_thin(visible_longitudes, visible_latitudes, cell)
+        visible_xs, visible_ys = m(visible_longitudes[kept], visible_latitudes[kept])
+        m.plot(visible_xs, visible_ys, 'bo', markersize=1, color=c)
     plt.legend()
     plt.tight_layout()
-    plt.savefig('./docs/media/{}.png'.format(name), dpi=1000)
-    plt.show()
+    finish(name, dpi=dpi)
 
+@timed('plotting')
 def plot_gs_vis(search_data, name):
     """Takes an input list of GroundStations with visibility lengths and color annotations and
     plots them onto a basemap projection. Data processing must be done before this function receives the list
@@ -68,8 +85,9 @@ def plot_gs_vis(search_data, name):
         search_data - annotated results of a grid search
         name - the name of the output file
     Output:
-        (side effect) - saves a map to ./docs/media/{name}.png
+        (side effect) - saves a map to {media_path}/{name}.png
     """
+    import matplotlib.pyplot as plt
     from operator import itemgetter
     from basis_converters.from_radians import degrees
     plt.figure(figsize=(8, 14), dpi=200)
@@ -80,25 +98,30 @@ def plot_gs_vis(search_data, name):
         gs_m_x, gs_m_y = m(degrees(gsx), degrees(gsy))
 
         m.plot(gs_m_x, gs_m_y, 'bo', markersize=density / max_density * 10, color=color)
-    plt.savefig("./docs/media/{}.png".format(name))
-    plt.show()
+    finish(name)
 
-def plot_polar(ground_station, results, name):
+@timed('plotting')
+def plot_polar(ground_station, results, name, passes=None, max_points=default_max_points):
     """Takes a GroundStation with a Visibility list and draws a map using a
     polar projection
 
     Input:
         ground_station - A GroundStation instance
         results - a Results instance
+        passes - optionally ground_station.divide_passes(results), if already
+            computed
+        max_points - the number of points drawn per pass (see decimation.lttb)
     Output:
-        (side effect) - saves a map to ./docs/media/{name}_stereo.png
+        (side effect) - saves a map to {media_path}/{name}_passes.png
     """
-    import altair
+    import matplotlib.pyplot as plt
+    from mpl_toolkits.basemap import Basemap
+    from numpy import arange
     from basis_converters.from_ecef import ecef_to_lat_long_h
     from basis_converters.from_radians import degrees
-    pass_times = ground_station.divide_passes(results)
-
-
+    from plotters.decimation import lttb
+    if passes is None:
+        passes = ground_station.divide_passes(results)
 
     lat, long = map(degrees, ground_station.lat_long)
 
@@ -110,17 +133,12 @@ def plot_polar(ground_station, results, name):
 
     long_m, lat_m = m(long, lat)
     plt.plot(long_m, lat_m, markersize=10)
-    for passes in pass_times:
-        lats = []
-        longs = []
-        for item in passes:
-            lat, long, _ = ecef_to_lat_long_h(item)
-            lats.append(degrees(lat))
-            longs.append(degrees(long))
-        longs_m, lats_m = m(longs, lats)
+    for ecef in passes:
+        lats, longs, _ = ecef_to_lat_long_h(ecef)
+        kept = lttb(arange(len(lats)), lats, max_points)
+        longs_m, lats_m = m(degrees(longs[kept]), degrees(lats[kept]))
         plt.plot(longs_m, lats_m)
-    plt.savefig("./docs/media/{}_passes.png".format(name))
-    plt.show()
+    finish('{}_passes'.format(name))
 
 def init_projection():
     """Initialises the map object which is used for all the earth_plotter tasks
@@ -129,6 +147,8 @@ def init_projection():
     Output:
         None
     """
+    import numpy
+    from mpl_toolkits.basemap import Basemap
     m = Basemap(projection='cyl', llcrnrlat=-90, urcrnrlat=90,\
               llcrnrlon=-180, urcrnrlon=180, resolution='c')
     m.drawcoastlines(linewidth=0.25)
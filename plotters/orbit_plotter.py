@@ -1,30 +1,32 @@
-import matplotlib as mpl
-from mpl_toolkits.mplot3d import Axes3D
-import matplotlib.pyplot as plt
-from numpy import matrix
+from plotters.render import finish
+from utils.instrumentation import timed
 
-def compare_3_orbits_2d(orbita, orbitb, orbitc):
+@timed('plotting')
+def compare_3_orbits_2d(orbita, orbitb, orbitc, name=None):
+    import matplotlib.pyplot as plt
     from basis_converters.rotation import rotate_x
     from basis_converters.from_eci import eci_to_kep
     fig, axes = plt.subplots(1,3, sharey=True)
     plt.style.use('seaborn-dark')
 
-    R, V = orbita.eci[0]
+    R, V = orbita.eci_r[0], orbita.eci_v[0]
     _, _, incl, _, _, _ = eci_to_kep(R, V)
     axes[0].set_ylabel('y (km)')
     for orbit, axis, c in zip([orbita, orbitb, orbitc], axes, ['r', 'g', 'b']):#
         axis.set_xlabel('x (km)')
 
 
-        xs, ys, _ = zip(*[rotate_x(-incl, point) for point in orbit.eci_r])
+        xs, ys, _ = rotate_x(-incl, orbit.eci_r).T
         axis.plot(xs, ys, label=orbit.pname, color=c)
         axis.set_xlim([-8000, 8000])
         axis.set_ylim([-8000, 8000])
         axis.set_title(orbit.pname)
 
-    plt.show()
+    finish(name)
 
-def compare_orbit_eci_3d(results):
+@timed('plotting')
+def compare_orbit_eci_3d(results, name=None):
+    import matplotlib.pyplot as plt
     from mpl_toolkits.mplot3d import Axes3D
     from basis_converters.from_eci import eci_to_kep
     fig = plt.figure()
@@ -40,15 +42,17 @@ def compare_orbit_eci_3d(results):
     plt.plot(xs, ys, zs, label=results.pname)
     plt.legend()
 
-    plt.show()
+    finish(name)
 
-def compare_orbit_eci(orbita, orbitb):
+@timed('plotting')
+def compare_orbit_eci(orbita, orbitb, name=None):
+    import matplotlib.pyplot as plt
     import numpy as np
     from basis_converters.from_eci import eci_to_kep
     from basis_converters.rotation import rotate_x
     import matplotlib.cm as mplcm
     import matplotlib.colors as colors
-    R, V = orbita.eci[0]
+    R, V = orbita.eci_r[0], orbita.eci_v[0]
     _, _, incl, _, _, _ = eci_to_kep(R, V)
 
     fig = plt.figure()
@@ -58,10 +62,10 @@ def compare_orbit_eci(orbita, orbitb):
     ax.set_xlabel('x (km)')
     ax.set_ylabel('y (km)')
 
-    rotated_orbita = [rotate_x(-incl, point) for point in orbita.eci_r]
-    rotated_orbitb = [rotate_x(-incl, point) for point in orbitb.eci_r]
-    for orbit, name in [(rotated_orbita, orbita.pname), (rotated_orbitb, orbitb.pname)]:
-        xs, ys, _ = zip(*orbit)
-        plt.scatter(xs, ys, marker=None, label=name)
+    rotated_orbita = rotate_x(-incl, orbita.eci_r)
+    rotated_orbitb = rotate_x(-incl, orbitb.eci_r)
+    for orbit, label in [(rotated_orbita, orbita.pname), (rotated_orbitb, orbitb.pname)]:
+        xs, ys, _ = orbit.T
+        plt.scatter(xs, ys, marker=None, label=label)
     plt.legend()
-    plt.show()
+    finish(name)
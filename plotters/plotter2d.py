@@ -1,6 +1,10 @@
-import matplotlib.pyplot as plt
+from plotters.decimation import default_max_points
+from plotters.render import finish
+from utils.instrumentation import timed
 
-def compare_two_vectors(vector_1_results, vector_2_results, xs, labels, context, vector1_name, vector2_name):
+@timed('plotting')
+def compare_two_vectors(vector_1_results, vector_2_results, xs, labels, context, vector1_name, vector2_name,
+        max_points=default_max_points):
     """Side by side comparison of the elements of two vectors, producing six graphs
     Input:
         vector1_results - A list of numpy.arrays with three elements
@@ -9,30 +13,37 @@ def compare_two_vectors(vector_1_results, vector_2_results, xs, labels, context,
         labels - (x_label, y_label, [3 element labels]),
         vector1_name - The string name for vector1
         vector2_name - The string name for vector2
+        max_points - the number of points drawn per line (see decimation.min_max_buckets)
     Output:
-        Six graphs, saved as ./docs/media/{context}{vector1_name}{vector2_name}.png directory as well as shown to the user
+        Six graphs, saved as {media_path}/{context}{vector1_name}{vector2_name}_comparison.png as well as shown to the user
     """
-    import itertools
+    import matplotlib.pyplot as plt
+    from numpy import asarray
+    from plotters.decimation import min_max_buckets
     plot_title = "Comparison of the {} vectors for a {} and {} propogated orbit".format(context, vector1_name, vector2_name)
     figs = []
 
     f, axes = plt.subplots(3, 2, sharex=True, sharey=False, figsize=(12, 8), dpi=80)
-    min_max_arr = list(itertools.chain(*(vector_1_results + vector_2_results)))
-    min_y = min(min_max_arr) * 1.15
-    max_y = max(min_max_arr) * 1.15
+    xs = asarray(xs)
+    vector_1_results = asarray(vector_1_results, dtype=float)
+    vector_2_results = asarray(vector_2_results, dtype=float)
+    min_y = min(vector_1_results.min(), vector_2_results.min()) * 1.15
+    max_y = max(vector_1_results.max(), vector_2_results.max()) * 1.15
 
-    for pair, ys_1, ys_2, l in zip(axes, zip(*vector_1_results), zip(*vector_2_results), labels[2]):
+    for pair, ys_1, ys_2, l in zip(axes, vector_1_results.T, vector_2_results.T, labels[2]):
         for axis, ys, vname in zip(pair, [ys_1, ys_2], [vector1_name, vector2_name]):
             axis.set_ylim([min_y, max_y])
             axis.set_title("{} {}".format(vname, l))
-            axis.plot(xs, ys)
+            kept = min_max_buckets(ys, max_points)
+            axis.plot(xs[kept], ys[kept])
 
     f.text(0.50, 0.04, labels[0],  ha='center', fontsize=14)
     f.text(0.04, 0.5, labels[1], va='center', rotation='vertical', fontsize=14)
-    plt.savefig("./docs/media/{}{}{}_comparison.png".format(context, vector1_name, vector2_name))
-    plt.show()
+    finish('{}{}{}_comparison'.format(context, vector1_name, vector2_name))
 
-def superimpose_two_vectors(vector_1_results, vector_2_results, xs, labels, context, vector1_name, vector2_name):
+@timed('plotting')
+def superimpose_two_vectors(vector_1_results, vector_2_results, xs, labels, context, vector1_name, vector2_name,
+        max_points=default_max_points):
     """Superimposes the elements of two vectors onto one another, producing three graphs
     Input:
         vector1_results - A list of numpy.arrays with three elements
@@ -41,39 +52,46 @@ def superimpose_two_vectors(vector_1_results, vector_2_results, xs, labels, cont
         labels - (x_label, y_label, [3 element labels]),
         vector1_name - The string name for vector1
         vector2_name - The string name for vector2
+        max_points - the number of points drawn per line (see decimation.min_max_buckets)
     Output:
-        Three graphs, saved as ./docs/media/{context}{vector1_name}{vector2_name}.png directory as well as shown to the user
+        Three graphs, saved as {media_path}/{context}{vector1_name}{vector2_name}_superimposed.png as well as shown to the user
     """
-    import itertools
+    import matplotlib.pyplot as plt
+    from numpy import asarray
+    from plotters.decimation import min_max_buckets
     plot_title = "Comparison of the {} vectors for a {} and {} propogated orbit".format(context, vector1_name, vector2_name)
     figs = []
 
     f, axes = plt.subplots(3, sharex=True, sharey=False, figsize=(12, 8), dpi=80)
-    min_max_arr = list(itertools.chain(*(vector_1_results + vector_2_results)))
-    min_y = min(min_max_arr) * 1.15
-    max_y = max(min_max_arr) * 1.15
+    xs = asarray(xs)
+    vector_1_results = asarray(vector_1_results, dtype=float)
+    vector_2_results = asarray(vector_2_results, dtype=float)
+    min_y = min(vector_1_results.min(), vector_2_results.min()) * 1.15
+    max_y = max(vector_1_results.max(), vector_2_results.max()) * 1.15
 
-    for axis, ys_1, ys_2, l in zip(axes, zip(*vector_1_results), zip(*vector_2_results), labels[2]):
+    for axis, ys_1, ys_2, l in zip(axes, vector_1_results.T, vector_2_results.T, labels[2]):
         axis.set_ylim([min_y, max_y])
-        print(sum([a - b for a, b in zip(ys_1, ys_2)]))
         axis.set_title("{} vs {} for {}".format(vector1_name, vector2_name, l))
-        axis.plot(xs, ys_1, color='b')
-        axis.plot(xs, ys_1, color='r')
+        kept_1 = min_max_buckets(ys_1, max_points)
+        kept_2 = min_max_buckets(ys_2, max_points)
+        axis.plot(xs[kept_1], ys_1[kept_1], color='b')
+        axis.plot(xs[kept_2], ys_2[kept_2], color='r')
 
     f.text(0.50, 0.04, labels[0],  ha='center', fontsize=14)
     f.text(0.04, 0.5, labels[1], va='center', rotation='vertical', fontsize=14)
-    plt.savefig("./docs/media/{}{}{}_superimposed.png".format(context, vector1_name, vector2_name))
-    plt.show()
+    finish('{}{}{}_superimposed'.format(context, vector1_name, vector2_name))
 
+@timed('plotting')
 def plot_gs_vis_2d(ground_stations_visibilities, name):
     """Plots a 2-dimensional grid of ground stations as red points, where the size of the point
     is scaled according to the size of the visibility index. Saves the result to
-    './docs/media/<fname>.png'
+    '{media_path}/<fname>.png'
 
     Input:
         ground_stations_visibilities - a list of tuples (GroundStation, int)
         name - the name to save the file as
     """
+    import matplotlib.pyplot as plt
     from basis_converters.from_radians import degrees
     from operator import itemgetter
     # Get the maximum size for scaling
@@ -86,5 +104,4 @@ def plot_gs_vis_2d(ground_stations_visibilities, name):
         plt.plot(gs_m_x, gs_m_y, 'bo', markersize=density / maximum * 10.0, color='r')
     plt.xlabel('longitude(degrees)')
     plt.ylabel('latitude(degrees)')
-    plt.savefig('./docs/media/{}.png'.format(name))
-    plt.show()
+    finish(name)
@@ -0,0 +1,94 @@
+"""
+Headless batch rendering of figures. Every plotter ends with finish, which
+saves its figure into the output directory (config.media_path unless set) and,
+in an interactive session, shows it. render runs a list of figure jobs across a
+pool of worker processes using matplotlib's non-interactive Agg backend, so
+nothing is shown and no display is needed.
+
+Workers are started with the spawn method, so none inherits the pyplot state of
+the calling process. Within a worker each job runs in its own rc_context, so
+style changes do not carry over to the next job, and all of its figures are
+closed when it ends
+"""
+
+# The settings of the current process, changed in workers by _init_worker
+_settings = {'output_path': None, 'interactive': True}
+# The files saved by the job running in this process, only recorded within a
+# render worker so that an interactive session does not accumulate them
+_written = []
+
+def output_file(fname):
+    """Returns the path fname is saved to in the output directory, creating
+    the directory if needed"""
+    import os
+    from config import media_path
+    output_path = _settings['output_path'] or media_path
+    os.makedirs(output_path, exist_ok=True)
+    path = os.path.join(output_path, fname)
+    if not _settings['interactive']:
+        _written.append(path)
+    return path
+
+def finish(name=None, **savefig_kwargs):
+    """Ends a plotter, saving the current figure as {name}.png in the output
+    directory if a name is given, then showing it if the session is
+    interactive
+    Input:
+        name - the name of the output file, without the extension
+        savefig_kwargs - passed on to savefig, such as dpi
+    """
+    import matplotlib.pyplot as plt
+    if name is not None:
+        plt.savefig(output_file('{}.png'.format(name)), **savefig_kwargs)
+    if _settings['interactive']:
+        plt.show()
+
+def render(jobs, output_path=None, processes=None):
+    """Renders figure jobs headlessly across a pool of worker processes
+    Input:
+        jobs - a list of (plotter, args) or (plotter, args, kwargs) tuples,
+            where plotter is a module level function of plotters (such as
+            earth_plotter.plot_polar) given the name to save under. The
+            arguments are pickled to the workers, so precomputed data (such as
+            lat_long or visibility) should be passed rather than recomputed
+        output_path - the directory figures are saved to, config.media_path
+            if None
+        processes - the number of worker processes, os.cpu_count() if None
+    Output:
+        paths - for each job, in order, a list of the files it saved
+    """
+    import os
+    from multiprocessing import get_context
+    jobs = list(jobs)
+    if not jobs:
+        return []
+    # Fails here, rather than in the pool initializer, where an error makes the
+    # pool respawn workers forever. The backend of this process is not changed
+    import matplotlib.backends.backend_agg
+    processes = min(processes or os.cpu_count() or 1, len(jobs))
+    with get_context('spawn').Pool(processes, _init_worker, (output_path,)) as pool:
+        # One job per task so that large and small figures balance across workers
+        return pool.map(render_job, jobs, chunksize=1)
+
+def render_job(job):
+    """Renders a single (plotter, args[, kwargs]) job in this process,
+    returning the files it saved"""
+    import matplotlib
+    if not _settings['interactive']:
+        # Selected here so that a failure is raised from pool.map
+        matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    plotter, args, *kwargs = job
+    kwargs = kwargs[0] if kwargs else {}
+    del _written[:]
+    try:
+        with matplotlib.rc_context():
+            plotter(*args, **kwargs)
+    finally:
+        plt.close('all')
+    return list(_written)
+
+def _init_worker(output_path):
+    # Nothing here may raise, or the pool respawns workers forever
+    _settings['output_path'] = output_path
+    _settings['interactive'] = False
@@ -1,31 +1,50 @@
-import matplotlib.pyplot as plt
+from plotters.decimation import default_max_points
+from plotters.render import finish
+from utils.instrumentation import timed
 
-def time_plot(data_series, time_delta, name):
-    import itertools
-    xs = [x * 10 for x in  range(len(data_series[0]))]
+@timed('plotting')
+def time_plot(data_series, time_delta, name, max_points=default_max_points):
+    """Plots three series of differences against time
+    Input:
+        data_series - three series of N values, such as the transpose of the
+            (N, 3) output of orbit_difference_hcl or orbit_difference_topo
+        time_delta - the time between values (s)
+        name - the name of the output file
+        max_points - the number of points drawn per series, keeping the
+            smallest and largest of each bucket (see decimation.min_max_buckets)
+    Output:
+        (side effect) - saves a graph to {media_path}/{name}.png
+    """
+    import matplotlib.pyplot as plt
+    from numpy import arange, asarray
+    from plotters.decimation import min_max_buckets
+    data_series = [asarray(series, dtype=float) for series in data_series]
+    xs = arange(len(data_series[0])) * time_delta
     handles = []
 
-    min_max_arr = list(itertools.chain(*(data_series)))
-    min_y = min(min_max_arr) * 1.15
-    max_y = max(min_max_arr) * 1.15
+    min_y = min(series.min() for series in data_series) * 1.15
+    max_y = max(series.max() for series in data_series) * 1.15
 
     f = plt.figure(figsize=(12, 8))
     plt.ylim([min_y, max_y])
     for series, color, l in zip(data_series, ['r', 'g', 'b'], ['e', 'n', 'u']):
-        handles.append(plt.scatter(xs, series, s=1, c=color, label=l).get_label())
+        kept = min_max_buckets(series, max_points)
+        handles.append(plt.scatter(xs[kept], series[kept], s=1, c=color, label=l).get_label())
     plt.legend(handles)
     plt.xlabel('time(s)')
     plt.ylabel('difference (km)')
     plt.grid()
-    plt.savefig('./docs/media/{}.png'.format(name))
-    plt.show()
+    finish(name)
 
 def timelines(y, xstart, xstop, color):
+    import matplotlib.pyplot as plt
     plt.hlines(y, xstart, xstop, color, lw=4)
     plt.vlines(xstart, y+0.03, y-0.03, color, lw=2)
     plt.vlines(xstop, y+0.03, y-0.03, color, lw=2)
 
-def time_series_plot(ground_stations_passes):
+@timed('plotting')
+def time_series_plot(ground_stations_passes, name=None):
+    import matplotlib.pyplot as plt
     from matplotlib.dates import DateFormatter, MinuteLocator
     from operator import itemgetter
     starts = []
@@ -47,4 +66,4 @@ def time_series_plot(ground_stations_passes):
 
     plt.xlim(min(starts), max(stops))
     plt.xlabel('Time')
-    plt.show()
+    finish(name)
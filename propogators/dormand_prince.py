@@ -0,0 +1,111 @@
+"""
+Adaptive step Dormand-Prince 5(4) integrator with dense output. Large internal
+steps are taken under error control, and the state is then interpolated onto
+whatever output grid is requested (typically the uniform dt grid of Results)
+"""
+
+# Butcher tableau for the Dormand-Prince 5(4) pair
+C = [0, 1/5, 3/10, 4/5, 8/9, 1]
+A = [
+    [],
+    [1/5],
+    [3/40, 9/40],
+    [44/45, -56/15, 32/9],
+    [19372/6561, -25360/2187, 64448/6561, -212/729],
+    [9017/3168, -355/33, 46732/5247, 49/176, -5103/18656],
+]
+B = [35/384, 0, 500/1113, 125/192, -2187/6784, 11/84, 0]
+# The difference between the fifth and fourth order weights
+E = [71/57600, 0, -71/16695, 71/1920, -17253/339200, 22/525, -1/40]
+# Coefficients of the fourth order continuous extension in powers of theta
+P = [
+    [1, -8048581381/2820520608, 8663915743/2820520608, -12715105075/11282082432],
+    [0, 0, 0, 0],
+    [0, 131558114200/32700410799, -68118460800/10900136933, 87487479700/32700410799],
+    [0, -1754552775/470086768, 14199869525/1410260304, -10690763975/1880347072],
+    [0, 127303824393/49829197408, -318862633887/49829197408, 701980252875/199316789632],
+    [0, -282668133/205662961, 2019193451/616988883, -1453857185/822651844],
+    [0, 40617522/29380423, -110615467/29380423, 69997945/29380423],
+]
+
+def propogate_dopri(R, V, times, acceleration, rtol=1e-10, atol=1e-9, max_step=None):
+    """Propogates an initial state to every time in times with an adaptive
+    Dormand-Prince 5(4) integrator, using dense output between internal steps
+
+    Input:
+        R - an array of x, y, z in the ECI basis in Km at time zero
+        V - an array of u, v, w in the ECI basis in Km/s at time zero
+        times - an increasing array of N times from zero (s)
+        acceleration - a function of an (..., 3) position array (Km) returning
+            the acceleration (Km/s^2)
+        rtol - the relative error tolerance per step
+        atol - the absolute error tolerance per step (Km, Km/s)
+        max_step - the largest internal step allowed (s), unbounded if None
+
+    Output:
+        states - an (N, 6) array of x, y, z (Km), u, v, w (Km/s) at each time
+    """
+    from numpy import abs, array, asarray, concatenate, cumprod, empty, inf, maximum, searchsorted, sqrt
+    times = asarray(times, dtype=float)
+    max_step = inf if max_step is None else max_step
+    A_ = [array(row) for row in A]
+    B_ = array(B)
+    E_ = array(E)
+    P_ = array(P)
+
+    def f(y):
+        return concatenate((y[3:], acceleration(y[:3])))
+
+    y = concatenate((asarray(R, dtype=float), asarray(V, dtype=float)))
+    states = empty((len(times), 6))
+    t = 0.0
+    emitted = searchsorted(times, t, side='right')
+    states[:emitted] = y
+    t_end = times[-1] if len(times) else t
+
+    K = empty((7, 6))
+    K[0] = f(y)
+    scale = atol + rtol * abs(y)
+    h = min(0.01 * sqrt((y**2 / scale**2).mean() / (K[0]**2 / scale**2).mean()), max_step)
+    while emitted < len(times):
+        h = min(h, max_step, t_end - t)
+        for stage in range(1, 6):
+            K[stage] = f(y + h * A_[stage] @ K[:stage])
+        y_new = y + h * B_[:6] @ K[:6]
+        K[6] = f(y_new)
+
+        scale = atol + rtol * maximum(abs(y), abs(y_new))
+        error = sqrt(((h * E_ @ K / scale)**2).mean())
+        if error > 1:
+            h *= max(0.2, 0.9 * error**-0.2)
+            continue
+
+        # Interpolates the accepted step onto any requested times it spans
+        t_new = t + h
+        done = searchsorted(times, t_new, side='right') if t_new < t_end else len(times)
+        if done > emitted:
+            theta = (times[emitted:done] - t) / h
+            powers = cumprod(theta[:, None].repeat(4, axis=1), axis=1)
+            states[emitted:done] = y + h * powers @ (K.T @ P_).T
+            emitted = done
+
+        t = t_new
+        y = y_new
+        K[0] = K[6]
+        h *= min(10, 0.9 * error**-0.2) if error > 0 else 10
+    return states
+
+def propogate_dopri_j2(R, V, times):
+    """Propogates an initial state to every time in times with the adaptive
+    Dormand-Prince integrator under the J2 gravity model
+
+    Input:
+        R - an array of x, y, z in the ECI basis in Km at time zero
+        V - an array of u, v, w in the ECI basis in Km/s at time zero
+        times - an increasing array of N times from zero (s)
+
+    Output:
+        states - an (N, 6) array of x, y, z (Km), u, v, w (Km/s) at each time
+    """
+    from propogators.gravity import acceleration
+    return propogate_dopri(R, V, times, acceleration)
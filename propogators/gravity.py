@@ -0,0 +1,83 @@
+"""
+Vectorised point mass plus zonal harmonic gravity model, shared by every
+integrator. Accelerations are evaluated on (..., 3) arrays of ECI positions, so
+one call serves a single state, every stage of a batch, or a whole track
+"""
+import functools
+
+# Fully normalised zonal coefficients C_n0 of EGM96, from degree 2
+normalised_c_n0 = [
+    -0.484165371736e-3,
+    0.957254173792e-6,
+    0.539873863789e-6,
+    0.685323475630e-7,
+    -0.149957994714e-6,
+]
+max_degree = len(normalised_c_n0) + 1
+
+@functools.lru_cache(maxsize=None)
+def zonal_coefficients(degree):
+    """Precomputes the per degree terms of the zonal expansion
+    Input:
+        degree - the highest degree included, 0 or 1 for a point mass only
+    Output:
+        a list of (n, mu * J_n * R^n, (2n - 1) / n, (n - 1) / n) for n = 2..degree,
+            the last two being the Legendre recurrence coefficients
+    """
+    from config import mu, r_reference
+    if degree > max_degree:
+        raise ValueError('zonal harmonics are available up to degree {}'.format(max_degree))
+    return [(n, mu * -normalised_c_n0[n - 2] * (2 * n + 1)**0.5 * r_reference**n,
+        (2 * n - 1) / n, (n - 1) / n) for n in range(2, degree + 1)]
+
+def acceleration(xyz, degree=2):
+    """Calculates the gravitational acceleration of the point mass and the zonal
+    harmonics up to degree, using the Legendre recurrences
+        n P_n = (2n - 1) s P_n-1 - (n - 1) P_n-2
+        P'_n = s P'_n-1 + n P_n-1
+    in s = z / r
+    Input:
+        xyz - an (..., 3) array of positions (km)
+        degree - the highest zonal degree included, 2 for J2
+    Output:
+        acceleration - an (..., 3) array (km/s^2)
+    """
+    from numpy import asarray, sqrt
+    from config import mu
+    xyz = asarray(xyz, dtype=float)
+    r = sqrt((xyz**2).sum(axis=-1))[..., None]
+    unit = xyz / r
+    s = unit[..., 2:]
+    acceleration = -mu * unit / r**2
+
+    p_previous, p = 1, s
+    dp_previous, dp = 0, 1
+    for n, coefficient, a_n, b_n in zonal_coefficients(degree):
+        p_previous, p = p, a_n * s * p - b_n * p_previous
+        dp_previous, dp = dp, s * dp + n * p_previous
+        factor = coefficient / r**(n + 2)
+        acceleration = acceleration + factor * ((n + 1) * p + s * dp) * unit
+        acceleration[..., 2:] -= factor * dp
+    return acceleration
+
+def potential(xyz, degree=2):
+    """Calculates the gravitational potential energy per unit mass of the point
+    mass and the zonal harmonics up to degree
+    Input:
+        xyz - an (..., 3) array of positions (km)
+        degree - the highest zonal degree included, 2 for J2
+    Output:
+        potential - an (...) array (km^2/s^2)
+    """
+    from numpy import asarray, sqrt
+    from config import mu
+    xyz = asarray(xyz, dtype=float)
+    r = sqrt((xyz**2).sum(axis=-1))
+    s = xyz[..., 2] / r
+    potential = -mu / r
+
+    p_previous, p = 1, s
+    for n, coefficient, a_n, b_n in zonal_coefficients(degree):
+        p_previous, p = p, a_n * s * p - b_n * p_previous
+        potential = potential + coefficient * p / r**(n + 1)
+    return potential
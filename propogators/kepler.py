@@ -34,6 +34,52 @@ def propogate_kepler(R, V, delta):
     Vdt = update_velocity(Ei, kep)
     return Rdt, Vdt
 
+def propogate_kepler_epochs(R, V, times):
+    """Calculates the state of a satellite at every time in times from a given
+    initial state R, V in a single vectorised pass. Since two-body motion is
+    analytic the elements are derived once, rather than re-derived per step
+
+    Input:
+    R - an array of x, y, z in the ECI basis in Km
+    V - an array of u, v, w in the ECI basis in Km/s
+    times - an array of N times from zero in s
+
+    Output:
+        states - an (N, 6) array of x, y, z (Km), u, v, w (Km/s) at each time
+    """
+    from numpy import arctan2, asarray, cos, empty, outer, pi, sin
+    from numpy.linalg import norm
+    from basis_converters.from_eci import eci_to_kep
+    from basis_converters.from_kep import gaussian_vectors
+    from config import mu
+    times = asarray(times, dtype=float)
+    a, e, incl, w, RA, TA = eci_to_kep(R, V)
+    r = norm(R)
+
+    n = (mu / a**3)**0.5
+    cosE0 = r * cos(TA) / a + e
+    sinE0 = r * sin(TA) / (a * (1 - e**2)**0.5)
+
+    E0 = arctan2(sinE0, cosE0)
+    E0 = E0 if E0 > 0 else E0 + 2*pi
+    M0 = E0 - e * sin(E0)
+    Ei = solve_kepler_array(e, M0 + n * times)
+
+    cosE = cos(Ei)
+    sinE = sin(Ei)
+    P, Q = gaussian_vectors(incl, w, RA)
+
+    x = a * (cosE - e)
+    y = a * (1 - e**2)**0.5 * sinE
+    r = a * (1 - e * cosE)
+    x_dot = -(a * mu)**0.5 * sinE / r
+    y_dot = (a * mu)**0.5 * (1 - e**2)**0.5 * cosE / r
+
+    states = empty((len(times), 6))
+    states[:, :3] = outer(x, P) + outer(y, Q)
+    states[:, 3:] = outer(x_dot, P) + outer(y_dot, Q)
+    return states
+
 def update_position(Ei, kep):
     """Calculates Rdt based on Ei and a set of Keplerian elements
     Input:
@@ -93,16 +139,136 @@ def kepler(E, Mi, e):
     from numpy import sin
     return E - e*sin(E) - Mi
 
+# Below this eccentricity the series starter is within 1.25e-4 rad, which one
+# Halley step takes to double precision
+series_max_e = 0.05
+
 def solve_kepler(e, Mi):
     """Solves the Keplerian equation rearranged to equal zero
     Input:
         Mi - the Mean Anomaly (radians) at the next time step
-        e - the eccentricity (should be in the range (0, 1))
+        e - the eccentricity (in the range [0, 1), or greater than 1 for a
+            hyperbolic orbit)
     Output:
         E - the Eccentric anomaly (radians) at the next time step
     """
-    from numpy import cos, pi, sin
-    E = pi if e > 0.8 else Mi
-    while abs(kepler(E, Mi, e)) > 1e-10:
-        E = E - (E - e*sin(E) - Mi) / (1 - e*cos(E))
-    return E
+    return float(solve_kepler_array(e, Mi))
+
+def solve_kepler_array(e, Mi):
+    """Solves the Keplerian equation for an array of Mean Anomalies at once,
+    using a fixed number of operations per element. Near circular orbits start
+    from the second order series in e, with an error below e^3, and take a
+    single Halley step. Otherwise Markley's starter is followed by a single
+    fifth order correction. For 0 <= e < 1 the result is accurate to double
+    precision (see benchmarks/kepler_solver.py). For e > 1 the hyperbolic
+    equation e sinh(H) - H = Mi is solved instead
+    Input:
+        Mi - an array of Mean Anomalies (radians)
+        e - the eccentricity (in the range [0, 1), or greater than 1 for a
+            hyperbolic orbit)
+    Output:
+        E - an array of Eccentric anomalies (radians), or hyperbolic anomalies
+            H for e > 1
+    """
+    from numpy import abs, asarray, copysign, cos, pi, rint, sin
+    from utils.instrumentation import count
+    Mi = asarray(Mi, dtype=float)
+    count('kepler_solutions', Mi.size)
+    if e > 1:
+        return solve_hyperbolic_kepler_array(e, Mi)
+    if not 0 <= e < 1:
+        raise ValueError('Cannot solve the Keplerian equation for e = {}'.format(e))
+    # Each solution takes a single correction of its starter
+    count('kepler_iterations', Mi.size)
+    if e < series_max_e:
+        E = Mi + e * sin(Mi) * (1 + e * cos(Mi))
+        return halley_step(e, Mi, E)
+
+    # Mi may span many orbits, so the equation is solved for the reduced mean
+    # anomaly in [0, pi], using E(-M) = -E(M), and the revolutions added back
+    revolutions = 2 * pi * rint(Mi / (2 * pi))
+    M = Mi - revolutions
+    sign = copysign(1, M)
+    M = abs(M)
+    E = householder_step(e, M, markley_starter(e, M))
+    return revolutions + sign * E
+
+def halley_step(e, M, E):
+    """Applies a single third order correction to an estimate of the Eccentric
+    Anomaly
+    Input:
+        e - the eccentricity (in the range [0, 1))
+        M - an array of Mean Anomalies (radians)
+        E - an array of estimates of the Eccentric anomalies (radians)
+    Output:
+        E - an array of the corrected Eccentric anomalies (radians)
+    """
+    from numpy import cos, sin
+    f2 = e * sin(E)
+    f0 = E - f2 - M
+    f1 = 1 - e * cos(E)
+    return E - f0 / (f1 - f0 * f2 / (2 * f1))
+
+def markley_starter(e, M):
+    """Markley's (1995) starting approximation to the Eccentric Anomaly, from the
+    root of a cubic fitted to the Keplerian equation, accurate to about 1e-4 rad
+    Input:
+        e - the eccentricity (in the range [0, 1))
+        M - an array of Mean Anomalies (radians) in the range [0, pi]
+    Output:
+        E - an array of Eccentric anomalies (radians)
+    """
+    from numpy import abs, cbrt, pi, sqrt
+    factor = pi - 6 / pi
+    alpha = (3 * pi + 1.6 * pi / (1 + e)) / factor - 1.6 / (factor * (1 + e)) * M
+    d = 3 * (1 - e) + alpha * e
+    alpha_d = alpha * d
+    M2 = M * M
+    q = 2 * (1 - e) * alpha_d - M2
+    r = (3 * (d - 1 + e) * alpha_d + M2) * M
+    w = cbrt(abs(r) + sqrt(q * q * q + r * r))
+    w *= w
+    return (2 * r * w / (w * w + w * q + q * q) + M) / d
+
+def householder_step(e, M, E):
+    """Applies a single fifth order correction to an estimate of the Eccentric
+    Anomaly, taking the error of Markley's starter to double precision
+    Input:
+        e - the eccentricity (in the range [0, 1))
+        M - an array of Mean Anomalies (radians) in the range [0, pi]
+        E - an array of estimates of the Eccentric anomalies (radians)
+    Output:
+        E - an array of the corrected Eccentric anomalies (radians)
+    """
+    from numpy import cos, sin
+    # The Keplerian equation and its first three derivatives at E
+    f2 = e * sin(E)
+    f3 = e * cos(E)
+    f0 = E - f2 - M
+    f1 = 1 - f3
+    d = -f0 / (f1 - f0 * f2 / (2 * f1))
+    d = -f0 / (f1 + d * (f2 / 2 + d * f3 / 6))
+    d = -f0 / (f1 + d * (f2 / 2 + d * (f3 / 6 - d * f2 / 24)))
+    return E + d
+
+def solve_hyperbolic_kepler_array(e, Mi):
+    """Solves the hyperbolic Keplerian equation e sinh(H) - H = Mi with Halley's
+    method, which converges monotonically from the logarithmic starter
+    Input:
+        Mi - an array of Mean Anomalies (radians)
+        e - the eccentricity (greater than 1)
+    Output:
+        H - an array of hyperbolic anomalies
+    """
+    from numpy import abs, asarray, cosh, log, maximum, sign, sinh
+    from utils.instrumentation import count
+    Mi = asarray(Mi, dtype=float)
+    H = sign(Mi) * log(2 * abs(Mi) / e + 1.8)
+    for _ in range(50):
+        count('kepler_iterations', Mi.size)
+        residual = e * sinh(H) - H - Mi
+        step = residual / (e * cosh(H) - 1 - residual * e * sinh(H) / (2 * (e * cosh(H) - 1)))
+        H = H - step
+        if (abs(step) <= 1e-15 * maximum(1, abs(H))).all():
+            break
+    return H
@@ -36,6 +36,37 @@ def propogate_rk4(R, V, h):
     V1 = [v0 + vk / h for v0, vk in zip(V, Q)]
     return array(R1), array(V1)
 
+def propogate_rk4_batch(states, h):
+    """Propgates a batch of spacecraft forwards one step using the rk4 monopole
+    gravity model, advancing every state in each RK stage at once
+    Input:
+        states - an (N, 6) array of x, y, z (Km), u, v, w (Km/s) in eci
+        h - the time step (s)
+    Output:
+        states - an (N, 6) array of the states propogated forwards by h
+    """
+    from numpy import empty
+    from numpy.linalg import norm
+    R = states[:, :3]
+    V = states[:, 3:]
+    k1_xyz = k(h, R, norm(R, axis=1)[:, None])
+
+    # Calculates the RK2 terms, the RK3 terms are evaluated at the same point
+    xyz_2 = f(R, V, h, k1_xyz)
+    k2_xyz = k(h, xyz_2, norm(xyz_2, axis=1)[:, None])
+    k3_xyz = k2_xyz
+
+    # Calculates the RK4 terms
+    xyz_4 = f1(R, V, h, k3_xyz)
+    k4_xyz = k(h, xyz_4, norm(xyz_4, axis=1)[:, None])
+
+    P = 1/3 * (k1_xyz + k2_xyz + k3_xyz)
+    Q = 1/3 * (k1_xyz + 2 * k2_xyz + 2 * k3_xyz + k4_xyz)
+    states_dt = empty(states.shape)
+    states_dt[:, :3] = R + h * V + P
+    states_dt[:, 3:] = V + Q / h
+    return states_dt
+
 def k(h, p, r):
     """The k function for a monopole gravity model
     Input:
@@ -1,9 +1,5 @@
-GM = 398600.4418
-a = 6378.1363
-c_2_0 = ((1/5)**0.5)**-1 * -0.0004841653711736
-
 def propogate_rk4(R, V, h):
-    """Propgates forwards one step using the rk4 monopole gravity model
+    """Propgates forwards one step using the rk4 J2 gravity model
     Input:
         R - a vector of eci elements in Km
         V - a vector of eci elements in Km/s
@@ -11,88 +7,99 @@ def propogate_rk4(R, V, h):
     Output:
         Rdt - R propogated forwards by h
         Vdt - V propogated forwards by h
+
+    The same model and stages as propogate_rk4_batch with degree 2, evaluated
+    on python floats, since for a single state the per call overhead of numpy
+    costs more than the arithmetic
     """
     from numpy import array
-    from numpy.linalg import norm
-    r = norm(R)
-    x0, y0, z0 = R
-
-    k1_x = k_xy(h, x0, r, z0)
-    k1_y = k_xy(h, y0, r, z0)
-    k1_z = k_z(h, z0, r)
-
-    # Calculates the RK2 terms
-    xyz_2 = [f(p, v, h, k) for p, v, k in zip(R, V, [k1_x, k1_y, k1_z])]
-    rk2 = norm(xyz_2)
+    x, y, z = (float(p) for p in R)
+    u, v, w = (float(p) for p in V)
+    s = 1/2 * h**2
 
-    x_2, y_2, z_2 = xyz_2
+    k1_x, k1_y, k1_z = (s * a for a in j2_acceleration(x, y, z))
 
-    k2_x = k_xy(h, x_2, rk2, z_2)
-    k2_y = k_xy(h, y_2, rk2, z_2)
-    k2_z = k_z(h, z_2, rk2)
-
-    # Calculates the RK3 terms
-    x_3, y_3, z_3 = [f(p, v, h, k) for p, v, k in zip(R, V, [k2_x, k2_y, k2_z])]
-    rk3 = rk2
-
-    k3_x = k_xy(h, x_3, rk3, z_3)
-    k3_y = k_xy(h, y_3, rk3, z_3)
-    k3_z = k_z(h, z_3, rk3)
+    # Calculates the RK2 terms, the RK3 terms are evaluated at the same point
+    # since the acceleration does not depend on velocity
+    k2_x, k2_y, k2_z = (s * a for a in j2_acceleration(
+        f(x, u, h, k1_x), f(y, v, h, k1_y), f(z, w, h, k1_z)))
 
     # Calculates the RK4 terms
-    xyz_4 = [f1(p, v, h, k) for p, v, k in zip(R, V, [k3_x, k3_y, k3_z])]
-    rk4 = norm(xyz_4)
-
-    x_4, y_4, z_4 = xyz_4
-
-    k4_x = k_xy(h, x_4, rk4, z_4)
-    k4_y = k_xy(h, y_4, rk4, z_4)
-    k4_z = k_z(h, z_4, rk4)
-
-    k1_xyz = [k1_x, k1_y, k1_z]
-    k2_xyz = [k2_x, k2_y, k2_z]
-    k3_xyz = [k3_x, k3_y, k3_z]
-    k4_xyz = [k4_x, k4_y, k4_z]
-
-    # Calculates the updated position using the k1_xyz, k2_xyz, k3_xyz, 4k_xyz elements
-    P = [1/3 * (k1 + k2 + k3) for k1, k2, k3 in zip(k1_xyz, k2_xyz, k3_xyz)]
-    Q = [1/3 * (k1 + 2 * k2 + 2 * k3 + k4) for k1, k2, k3, k4 in zip(k1_xyz, k2_xyz, k3_xyz, k4_xyz)]
-    R1 = [f1(r0, h, v0, pk) for r0, v0, pk in zip(R, V, P)]
-    V1 = [v0 + vk / h for v0, vk in zip(V, Q)]
-    return array(R1), array(V1)
-
-def k_xy(h, p, r, z):
-    """calculates k_x or k_y including the J2 perturbation for x and y only
-    Globals:
-        c_2_0 - the denormalised c_2_0 coefficient
-        GM - the standard gravitational parameter (km^3 / s^2)
+    k4_x, k4_y, k4_z = (s * a for a in j2_acceleration(
+        f1(x, u, h, k2_x), f1(y, v, h, k2_y), f1(z, w, h, k2_z)))
+
+    # As propogate_rk4_batch with k3 = k2
+    Rdt = array([
+        f1(x, u, h, 1/3 * (k1_x + 2 * k2_x)),
+        f1(y, v, h, 1/3 * (k1_y + 2 * k2_y)),
+        f1(z, w, h, 1/3 * (k1_z + 2 * k2_z))])
+    Vdt = array([
+        u + 1/3 * (k1_x + 4 * k2_x + k4_x) / h,
+        v + 1/3 * (k1_y + 4 * k2_y + k4_y) / h,
+        w + 1/3 * (k1_z + 4 * k2_z + k4_z) / h])
+    return Rdt, Vdt
+
+def j2_acceleration(x, y, z):
+    """Calculates the acceleration of gravity.acceleration with degree 2 for a
+    single position of python floats
     Input:
-        p - a position parameter, x, y, z (km)
-        v - a velocityparameter, u, v, w (km/s)
+        x, y, z - the position (km)
+    Output:
+        a_x, a_y, a_z - (km/s^2)
+    """
+    from config import mu
+    from propogators.gravity import zonal_coefficients
+    (_, mu_j2_r2, _, _), = zonal_coefficients(2)
+    r2 = x * x + y * y + z * z
+    r = r2**0.5
+    monopole = -mu / (r2 * r)
+    j2 = 3/2 * mu_j2_r2 / (r2 * r2 * r)
+    z2 = 5 * z * z / r2
+    xy = monopole + j2 * (z2 - 1)
+    return x * xy, y * xy, z * (monopole + j2 * (z2 - 3))
+
+def propogate_rk4_batch(states, h, degree=2):
+    """Propgates a batch of spacecraft forwards one step using the rk4 zonal
+    gravity model, advancing every state in each RK stage at once
+    Input:
+        states - an (N, 6) array of x, y, z (Km), u, v, w (Km/s) in eci
         h - the time step (s)
-        k - the previous k term (km)
+        degree - the highest zonal degree of the gravity model, 2 for J2
     Output:
-        k_x/k_y - (km)
+        states - an (N, 6) array of the states propogated forwards by h
     """
-    return (1/2 * h**2 * (
-        ((-GM * p) / r**3) +
-        ((3/2 * GM * a**2) / r**5) * c_2_0 * p * (1 - 5 * z**2 / r**2)))
+    from numpy import empty
+    R = states[:, :3]
+    V = states[:, 3:]
+    k1_xyz = k(h, R, degree)
+
+    # Calculates the RK2 terms, the RK3 terms are evaluated at the same point
+    # since the acceleration does not depend on velocity
+    k2_xyz = k(h, f(R, V, h, k1_xyz), degree)
+    k3_xyz = k2_xyz
 
-def k_z(h, p, r):
-    """k_z calculation including the J2 perturbation for z only
-    Globals:
-        c_2_0 - the denormalised c_2_0 coefficient
-        GM - the standard gravitational parameter (km^3 / s^2)
+    # Calculates the RK4 terms
+    k4_xyz = k(h, f1(R, V, h, k3_xyz), degree)
+
+    # Calculates the updated position using the k1_xyz, k2_xyz, k3_xyz, 4k_xyz elements
+    P = 1/3 * (k1_xyz + k2_xyz + k3_xyz)
+    Q = 1/3 * (k1_xyz + 2 * k2_xyz + 2 * k3_xyz + k4_xyz)
+    states_dt = empty(states.shape)
+    states_dt[:, :3] = f1(R, V, h, P)
+    states_dt[:, 3:] = V + Q / h
+    return states_dt
+
+def k(h, xyz, degree=2):
+    """calculates k_x, k_y and k_z including the zonal perturbations
     Input:
-        p - a position parameter, x, y, z (km)
-        v - a velocityparameter, u, v, w (km/s)
         h - the time step (s)
-        k - the previous k term (km)
+        xyz - an (N, 3) array of positions (km)
+        degree - the highest zonal degree of the gravity model, 2 for J2
     Output:
-        k_z - (km)
+        k - an (N, 3) array (km)
     """
-    return (1/2 * h**2 * (((-GM * p) / r**3) +
-        3/2 * GM * a**2 / r**5 * c_2_0 * p * (3 - 5 * p**2 / r**2)))
+    from propogators.gravity import acceleration
+    return 1/2 * h**2 * acceleration(xyz, degree)
 
 def f(p, v, h, k):
     """Calculates the RK2 and RK3 terms
@@ -0,0 +1,158 @@
+"""
+Symplectic integrators for the point mass and zonal gravity models. Each
+scheme is a composition of drifts (R += c h V) and kicks (V += d h a(R)), so
+energy errors stay bounded rather than growing secularly, and much larger
+steps can be taken over long arcs than with rk4
+"""
+
+# Yoshida's (1990) fourth order composition of three leapfrog steps
+_w1 = 1 / (2 - 2**(1 / 3))
+_w0 = -2**(1 / 3) / (2 - 2**(1 / 3))
+
+# (drift coefficients, kick coefficients) applied in alternation
+schemes = {
+    'verlet': ((0, 1), (1/2, 1/2)),
+    'yoshida': ((_w1 / 2, (_w0 + _w1) / 2, (_w0 + _w1) / 2, _w1 / 2), (_w1, _w0, _w1, 0)),
+}
+
+def propogate_verlet(R, V, h):
+    """Propgates forwards one step using velocity Verlet under the monopole
+    gravity model
+    Input:
+        R - a vector of eci elements in Km
+        V - a vector of eci elements in Km/s
+        h - the time step (s)
+    Output:
+        Rdt - R propogated forwards by h
+        Vdt - V propogated forwards by h
+    """
+    return _step(R, V, h, 'verlet', 0)
+
+def propogate_verlet_j2(R, V, h):
+    """Propgates forwards one step using velocity Verlet under the J2 gravity model
+    Input:
+        R - a vector of eci elements in Km
+        V - a vector of eci elements in Km/s
+        h - the time step (s)
+    Output:
+        Rdt - R propogated forwards by h
+        Vdt - V propogated forwards by h
+    """
+    return _step(R, V, h, 'verlet', 2)
+
+def propogate_yoshida(R, V, h):
+    """Propgates forwards one step using the fourth order Yoshida scheme under
+    the monopole gravity model
+    Input:
+        R - a vector of eci elements in Km
+        V - a vector of eci elements in Km/s
+        h - the time step (s)
+    Output:
+        Rdt - R propogated forwards by h
+        Vdt - V propogated forwards by h
+    """
+    return _step(R, V, h, 'yoshida', 0)
+
+def propogate_yoshida_j2(R, V, h):
+    """Propgates forwards one step using the fourth order Yoshida scheme under
+    the J2 gravity model
+    Input:
+        R - a vector of eci elements in Km
+        V - a vector of eci elements in Km/s
+        h - the time step (s)
+    Output:
+        Rdt - R propogated forwards by h
+        Vdt - V propogated forwards by h
+    """
+    return _step(R, V, h, 'yoshida', 2)
+
+def propogate_symplectic_batch(states, h, scheme='yoshida', degree=2):
+    """Propgates a batch of spacecraft forwards one step with a symplectic scheme
+    Input:
+        states - an (N, 6) array of x, y, z (Km), u, v, w (Km/s) in eci
+        h - the time step (s)
+        scheme - 'verlet' or 'yoshida'
+        degree - the highest zonal degree of the gravity model, 0 for a point mass
+    Output:
+        states - an (N, 6) array of the states propogated forwards by h
+    """
+    from numpy import concatenate
+    R, V, _ = advance(states[:, :3], states[:, 3:], h, 1, scheme, degree)
+    return concatenate((R, V), axis=1)
+
+def propogate_symplectic(R, V, times, scheme='yoshida', degree=2, max_step=None):
+    """Propogates an initial state to every time in times with a fixed step
+    symplectic scheme. Every interval between requested times is divided into
+    equal steps of at most max_step, and the acceleration is carried between
+    steps where the scheme allows (velocity Verlet needs one evaluation per
+    step). For use with a Simulator in grid mode, through functools.partial
+    to choose the scheme and degree
+
+    Input:
+        R - an array of x, y, z in the ECI basis in Km at time zero
+        V - an array of u, v, w in the ECI basis in Km/s at time zero
+        times - an increasing array of N times from zero (s)
+        scheme - 'verlet' or 'yoshida'
+        degree - the highest zonal degree of the gravity model, 0 for a point mass
+        max_step - the largest step (s), the smallest interval between
+            consecutive times if None
+
+    Output:
+        states - an (N, 6) array of x, y, z (Km), u, v, w (Km/s) at each time
+    """
+    from numpy import asarray, ceil, concatenate, diff, empty
+    times = asarray(times, dtype=float)
+    R = asarray(R, dtype=float)
+    V = asarray(V, dtype=float)
+    if max_step is None:
+        intervals = diff(concatenate(([0.0], times)))
+        intervals = intervals[intervals > 0]
+        max_step = intervals.min() if len(intervals) else 1.0
+
+    states = empty((len(times), 6))
+    t = 0.0
+    a = None
+    for i, t_i in enumerate(times):
+        interval = t_i - t
+        if interval > 0:
+            # The tolerance keeps an interval equal to max_step, up to rounding, to one step
+            n = max(1, int(ceil(interval / max_step * (1 - 1e-12))))
+            R, V, a = advance(R, V, interval / n, n, scheme, degree, a)
+        states[i, :3] = R
+        states[i, 3:] = V
+        t = t_i
+    return states
+
+def advance(R, V, h, n, scheme='yoshida', degree=2, a=None):
+    """Applies n steps of a symplectic scheme
+    Input:
+        R - an (..., 3) array of positions (Km)
+        V - an (..., 3) array of velocities (Km/s)
+        h - the time step (s)
+        n - the number of steps
+        scheme - 'verlet' or 'yoshida'
+        degree - the highest zonal degree of the gravity model, 0 for a point mass
+        a - the acceleration at R if already known, for example from the last
+            kick of a previous call
+    Output:
+        R - the propogated positions (Km)
+        V - the propogated velocities (Km/s)
+        a - the acceleration at R if the last operation was a kick, otherwise None
+    """
+    from propogators.gravity import acceleration
+    drifts, kicks = schemes[scheme]
+    for _ in range(n):
+        for c, d in zip(drifts, kicks):
+            if c:
+                R = R + c * h * V
+                a = None
+            if d:
+                if a is None:
+                    a = acceleration(R, degree)
+                V = V + d * h * a
+    return R, V, a
+
+def _step(R, V, h, scheme, degree):
+    from numpy import asarray
+    R, V, _ = advance(asarray(R, dtype=float), asarray(V, dtype=float), h, 1, scheme, degree)
+    return R, V
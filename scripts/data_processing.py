@@ -1,4 +1,4 @@
-def compute_passes(ground_stations, orbit_results):
+def compute_passes(ground_stations, orbit_results, refine=False):
     from basis_converters.from_radians import degrees
     """Given ground stations and an orbit, computes passes for the orbit and saves them to a file in ./docs/media/<fname>.tex
     with a file name derived from the latitude, longitude coordinates, in tex table format
@@ -6,6 +6,7 @@ def compute_passes(ground_stations, orbit_results):
     Input:
         ground_stations - a list of GroundStation instances
         orbit_results - a Result instance
+        refine - if True pass start and end times are refined between samples
 
     Output:
         .tex tables for each GroundStation's passes
@@ -17,7 +18,7 @@ def compute_passes(ground_stations, orbit_results):
     """
     results = []
     for gs in ground_stations:
-        passes = gs.pass_times(orbit_results)
+        passes = gs.pass_times(orbit_results, refine)
         lat, long = map(degrees, gs.lat_long)
         results.append((gs, passes))
         continue
@@ -26,3 +27,25 @@ def compute_passes(ground_stations, orbit_results):
             for (start_t, start_e, start_a), (end_t, end_e, end_a) in passes:
                 print(start_t, start_e, start_a, end_t, end_e, end_a, end_t - start_t, sep=" & ", end="\\\\ \n", file=f)
     return results
+
+def compute_passes_streaming(ground_stations, simulator, n, dt, chunk_size=8640):
+    """Computes passes for every ground station from a propogation streamed in
+    chunks, so that long periods run in constant memory
+
+    Input:
+        ground_stations - a list of GroundStation instances
+        simulator - a Simulator instance
+        n - the number of steps to propogate forwards by
+        dt - the time step (s)
+        chunk_size - the number of states held at once
+
+    Output:
+        results - a list of (ground station, passes) tuples, as for compute_passes
+    """
+    passes = [[] for _ in ground_stations]
+    start_passes = [None for _ in ground_stations]
+    for chunk in simulator.propogate_chunks(n, dt, chunk_size):
+        for index, gs in enumerate(ground_stations):
+            chunk_passes, start_passes[index] = gs.chunk_passes(chunk, start_passes[index])
+            passes[index].extend(chunk_passes)
+    return list(zip(ground_stations, passes))
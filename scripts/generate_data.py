@@ -1,10 +1,10 @@
 from models.simulator import Simulator
 from models.spacecraft_state import SpacecraftState
-from propogators.kepler import propogate_kepler
+from propogators.kepler import propogate_kepler_epochs
 from propogators.rk4_monopole import propogate_rk4 as monopole_rk4
 from propogators.rk4_monopole_j2 import propogate_rk4 as j2_rk4
 
-def propogate_kep_rk4(fname, delta, n_iterations):
+def propogate_kep_rk4(fname, delta, n_iterations, processes=None):
     """Loads the file specified at fname into a SpacecraftState instance, and then
     propogates for time difference delta and the specified n_iterations for the
     propogate_kepler, rk4_monopole, and j2_rk4 algorithms
@@ -13,22 +13,101 @@ def propogate_kep_rk4(fname, delta, n_iterations):
         fname - the file on disk to load
         delta - the time delta with which to propogate
         n_iterations - the number of steps to propogate forwards by
+        processes - the number of worker processes (see utils.parallel.run_simulations)
     Output:
         (Results, Results, Results) - where Results is a result of one of the algorithms
     """
-    import pickle
-    import os
-    from utils.save_load import save, load
+    from utils.parallel import run_simulations
 
     with open(fname) as f:
       spacecraft = SpacecraftState.fromData(f)
 
-    kep_sim = Simulator(spacecraft.copy(), propogate_kepler, 'kep')
+    kep_sim = Simulator(spacecraft.copy(), propogate_kepler_epochs, 'kep', grid=True)
     rk4_sim = Simulator(spacecraft.copy(), monopole_rk4, 'kep2')
     rk4_j2_sim = Simulator(spacecraft.copy(), j2_rk4, 'rk4j2')
 
-    kep_vectors = kep_sim.propogate_in_period(n_iterations, delta)
-    rk4_vectors = rk4_sim.propogate_in_period(n_iterations, delta)
-    rk4_j2_vectors = rk4_j2_sim.propogate_in_period(n_iterations, delta)
+    kep_vectors, rk4_vectors, rk4_j2_vectors = run_simulations(
+        [(sim, n_iterations, delta) for sim in [kep_sim, rk4_sim, rk4_j2_sim]], processes)
 
     return kep_vectors, rk4_vectors, rk4_j2_vectors
+
+def propogate_sweep(fnames, deltas, period, processes=None):
+    """Propogates every spacecraft in fnames with the Keplerian, rk4_monopole
+    and j2_rk4 algorithms at every time delta over the same period, fanning the
+    runs out across worker processes
+
+    Input:
+        fnames - a list of spacecraft files on disk to load
+        deltas - a list of time deltas with which to propogate (s)
+        period - the length of time to propogate over (s)
+        processes - the number of worker processes (see utils.parallel.run_simulations)
+    Output:
+        results - a dict of {(fname, delta): (Results, Results, Results)}
+    """
+    from utils.parallel import run_simulations
+    jobs = []
+    for fname in fnames:
+        with open(fname) as f:
+            spacecraft = SpacecraftState.fromData(f)
+        for delta in deltas:
+            n_iterations = int(round(period / delta))
+            jobs.append((Simulator(spacecraft.copy(), propogate_kepler_epochs, 'kep', grid=True), n_iterations, delta))
+            jobs.append((Simulator(spacecraft.copy(), monopole_rk4, 'kep2'), n_iterations, delta))
+            jobs.append((Simulator(spacecraft.copy(), j2_rk4, 'rk4j2'), n_iterations, delta))
+    results = run_simulations(jobs, processes)
+    keys = [(fname, delta) for fname in fnames for delta in deltas]
+    return {key: tuple(results[3 * index:3 * index + 3]) for index, key in enumerate(keys)}
+
+def propogate_long_horizon(fname, delta, n_iterations, processes=None):
+    """Propogates the spacecraft in fname under the J2 gravity model with j2_rk4
+    and the symplectic velocity Verlet and Yoshida schemes, then prints the
+    drift of energy and angular momentum of each, to judge how large a step
+    each can take over a long arc
+
+    Input:
+        fname - the file on disk to load
+        delta - the time delta with which to propogate
+        n_iterations - the number of steps to propogate forwards by
+        processes - the number of worker processes (see utils.parallel.run_simulations)
+    Output:
+        (Results, Results, Results) - the rk4, Verlet and Yoshida propogations
+    """
+    from utils.parallel import run_simulations
+    from validation_tools.conservation import print_conservation_report
+
+    with open(fname) as f:
+      spacecraft = SpacecraftState.fromData(f)
+
+    results = run_simulations([(make_simulator(name, spacecraft.copy()), n_iterations, delta)
+        for name in ['rk4j2', 'verlet', 'yoshida']], processes)
+    print_conservation_report(results, degree=2)
+    return tuple(results)
+
+# The propogators available to make_simulator
+propogator_names = ('kep', 'rk4', 'rk4j2', 'dopri', 'verlet', 'yoshida')
+
+def make_simulator(name, spacecraft):
+    """Builds a Simulator for one of the propogators in propogator_names, with
+    the pname used for it elsewhere so that cached results are shared
+
+    Input:
+        name - the name of the propogator, one of propogator_names
+        spacecraft - a SpacecraftState instance
+    Output:
+        simulator - a Simulator instance
+    """
+    import functools
+    if name == 'kep':
+        return Simulator(spacecraft, propogate_kepler_epochs, 'kep', grid=True, closed_form=True)
+    if name == 'rk4':
+        return Simulator(spacecraft, monopole_rk4, 'kep2')
+    if name == 'rk4j2':
+        return Simulator(spacecraft, j2_rk4, 'rk4j2')
+    if name == 'dopri':
+        from propogators.dormand_prince import propogate_dopri_j2
+        return Simulator(spacecraft, propogate_dopri_j2, 'dopri', grid=True)
+    if name in ('verlet', 'yoshida'):
+        from propogators.symplectic import propogate_symplectic
+        return Simulator(spacecraft, functools.partial(propogate_symplectic,
+            scheme=name, degree=2), name + 'j2', grid=True)
+    raise ValueError('Unknown propogator {}, expected one of {}'.format(name, ', '.join(propogator_names)))
@@ -0,0 +1,23 @@
+def generate_land_mask(land, resolution, fname):
+    """Downsamples a fine global land raster into the low resolution mask used by
+    optimisation_tools.land_mask, and saves it. data/land_mask.npz was generated
+    at 0.25 degrees from the 30 arc-second GLOBE land/sea raster (NOAA, public
+    domain), as distributed with the global-land-mask package
+
+    Input:
+        land - a (rows, columns) boolean raster, True over land, with rows running
+            from latitude 90 to -90 and columns from longitude -180 to 180
+        resolution - the cell size of the output mask (degrees), which must divide
+            the raster evenly
+        fname - the file to save the mask to
+    Output:
+        (side effect) - saves the bit packed mask, where a cell is land if the
+            majority of the raster within it is land
+    """
+    from numpy import packbits, savez_compressed
+    rows, columns = int(round(180 / resolution)), int(round(360 / resolution))
+    block_rows, block_columns = land.shape[0] // rows, land.shape[1] // columns
+    fraction = land[:rows * block_rows, :columns * block_columns].reshape(
+        rows, block_rows, columns, block_columns).mean(axis=(1, 3))
+    savez_compressed(fname, mask=packbits(fraction >= 0.5, axis=1), resolution=resolution,
+        shape=fraction.shape)
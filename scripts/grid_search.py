@@ -28,6 +28,22 @@ def grid_search_task(results):
     plot_gs_vis(plottable_results, 'ideal_gs')
     return plottable_results
 
+def grid_search_fine_task(results, target_increment):
+    """Locates the best candidate ground stations to within target_increment using
+    the coarse to fine grid search, and plots them
+    Inputs:
+        results: Any Results instance, but ideally the Results generated using the most comprehensive model
+        target_increment: the final lattice spacing (radians)
+    Outputs:
+        plottable_results - a list of [(GroundStation, int)] tuples
+    """
+    from plotters.plotter2d import plot_gs_vis_2d
+    from optimisation_tools.grid_search import grid_search_hierarchical
+    search = grid_search_hierarchical(results, target_increment)
+    plottable_results = [(gs, len(visibility)) for gs, visibility in search]
+    plot_gs_vis_2d(plottable_results, 'hierarchical_gs')
+    return plottable_results
+
 def find_candidate_gs(results):
     """Finds four candidate ground stations based on a grid search, computes pass
     data, and then creates visualisations using a stereo projection
@@ -36,4 +52,4 @@ def find_candidate_gs(results):
     Outputs:
         This is a script, so it has no output but hooks into application functionality
     """
-    candidates = [ground_station for ground_station, _, c in grid_search_task(results) if c='g']
+    candidates = [ground_station for ground_station, _, c in grid_search_task(results) if c == 'g']
@@ -7,9 +7,9 @@ def compare_orbits_rv(orbit1_results, orbit2_results):
         Twelve graphs, saved in the ./docs/media directory as well as shown to the user
     """
     from plotters.plotter2d import compare_two_vectors
-    orbit1_r, orbit1_v = zip(*orbit1_results.eci)
+    orbit1_r, orbit1_v = orbit1_results.eci_r, orbit1_results.eci_v
 
-    orbit2_r, orbit2_v = zip(*orbit2_results.eci)
+    orbit2_r, orbit2_v = orbit2_results.eci_r, orbit2_results.eci_v
     time = [10 * i for i in range(len(orbit1_r))]
     compare_two_vectors(orbit1_r, orbit2_r, time, ('eci position (km)', 'time (s)', ['x', 'y', 'z']), 'position',
                         orbit1_results.pname,
@@ -27,9 +27,9 @@ def compare_orbits_superimposed(orbit1_results, orbit2_results):
         Six graphs, saved in the ./docs/media directory as well as shown to the user
     """
     from plotters.plotter2d import superimpose_two_vectors
-    orbit1_r, orbit1_v = zip(*orbit1_results.eci)
+    orbit1_r, orbit1_v = orbit1_results.eci_r, orbit1_results.eci_v
 
-    orbit2_r, orbit2_v = zip(*orbit2_results.eci)
+    orbit2_r, orbit2_v = orbit2_results.eci_r, orbit2_results.eci_v
     time = [10 * i for i in range(len(orbit1_r))]
     superimpose_two_vectors(orbit1_r, orbit2_r, time, ('eci position (km)', 'time (s)', ['x', 'y', 'z']), 'position',
                         orbit1_results.pname,
@@ -48,7 +48,7 @@ def compare_orbits_hcl(results_a, results_b, name):
     from validation_tools.orbit_comparison import orbit_difference_hcl
     from plotters.time_plotter import time_plot
     plot_points = orbit_difference_hcl(results_a, results_b)
-    time_plot(plot_points, 10, name)
+    time_plot(plot_points.T, 10, name)
 
 def plotting_task():
     """All purpose plotting task for miscellaneous plotting functions uncomment desired line to plot
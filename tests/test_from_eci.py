@@ -0,0 +1,36 @@
+"""Round trips between eci states and Keplerian elements"""
+import numpy
+import pytest
+from basis_converters.from_eci import eci_to_kep
+from basis_converters.from_kep import kep_to_eci
+from config import mu
+
+v_circular = (mu / 7000)**0.5
+
+@pytest.mark.parametrize('position, velocity', [
+    # Equatorial and eccentric, prograde and retrograde, periapsis off the x axis
+    ([0, 7000, 0], [-1.1 * v_circular, 0, 0]),
+    ([0, 7000, 0], [1.1 * v_circular, 0, 0]),
+    ([5000, -4000, 0], [3, 4.5, 0]),
+    ([5000, -4000, 0], [-3, -4.5, 0]),
+    # Equatorial and circular
+    ([7000, 0, 0], [0, v_circular, 0]),
+    ([0, -7000, 0], [-v_circular, 0, 0]),
+    # Inclined and eccentric
+    ([7000, 0, 10], [0, 7.2, 1.0]),
+])
+def test_round_trip(position, velocity):
+    R, V = kep_to_eci(eci_to_kep(position, velocity))
+    numpy.testing.assert_allclose(R, position, rtol=0, atol=1e-8)
+    numpy.testing.assert_allclose(V, velocity, rtol=0, atol=1e-11)
+
+def test_round_trip_array():
+    rng = numpy.random.default_rng(0)
+    angles = rng.uniform(0, 2 * numpy.pi, 50)
+    position = 7000 * numpy.stack((numpy.cos(angles), numpy.sin(angles), numpy.zeros(50)), axis=1)
+    # Equatorial orbits of either direction between circular and e = 0.2
+    speeds = v_circular * rng.uniform(0.9, 1.1, (50, 1)) * rng.choice([-1, 1], (50, 1))
+    velocity = speeds * numpy.stack((-numpy.sin(angles + 0.3), numpy.cos(angles + 0.3), numpy.zeros(50)), axis=1)
+    R, V = kep_to_eci(numpy.stack(eci_to_kep(position, velocity), axis=-1))
+    numpy.testing.assert_allclose(R, position, rtol=0, atol=1e-8)
+    numpy.testing.assert_allclose(V, velocity, rtol=0, atol=1e-11)
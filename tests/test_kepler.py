@@ -0,0 +1,26 @@
+"""Checks of the closed form Kepler propagator"""
+import numpy
+import pytest
+from config import mu
+from propogators.kepler import propogate_kepler_epochs
+
+v_circular = (mu / 7000)**0.5
+
+@pytest.mark.parametrize('R, V', [
+    # Equatorial and eccentric, prograde and retrograde
+    ([0, 7000, 0], [-1.1 * v_circular, 0, 0]),
+    ([5000, -4000, 0], [-3, -4.5, 0]),
+    # Equatorial and circular
+    ([7000, 0, 0], [0, v_circular, 0]),
+    # Inclined, eccentric and circular
+    ([7000, 0, 10], [0, 7.2, 1.0]),
+    ([0, 7000, 0], [-v_circular * 0.6, 0, v_circular * 0.8]),
+])
+def test_initial_state(R, V):
+    a = 1 / (2 / numpy.linalg.norm(R) - numpy.dot(V, V) / mu)
+    period = 2 * numpy.pi * (a**3 / mu)**0.5
+    states = propogate_kepler_epochs(numpy.array(R, dtype=float), numpy.array(V, dtype=float), [0, period])
+    # The state at t = 0 is the input, as is the state one period later
+    for state in states:
+        numpy.testing.assert_allclose(state[:3], R, rtol=0, atol=1e-7)
+        numpy.testing.assert_allclose(state[3:], V, rtol=0, atol=1e-10)
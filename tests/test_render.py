@@ -0,0 +1,32 @@
+"""Smoke tests of headless rendering, skipped without matplotlib"""
+import os
+import numpy
+import pytest
+
+pytest.importorskip('matplotlib')
+
+def test_render(tmp_path):
+    from plotters.render import render
+    from plotters.time_plotter import time_plot
+    series = numpy.sin(numpy.arange(3 * 500).reshape(3, 500) / 50)
+    paths = render([(time_plot, (series, 10, 'first')), (time_plot, (series, 10, 'second'))],
+        str(tmp_path), processes=2)
+    assert paths == [[str(tmp_path / 'first.png')], [str(tmp_path / 'second.png')]]
+    for (path,) in paths:
+        assert os.path.getsize(path) > 0
+
+def test_interactive_saves_are_not_recorded(tmp_path, monkeypatch):
+    from plotters import render
+    monkeypatch.setitem(render._settings, 'output_path', str(tmp_path))
+    render.output_file('figure.png')
+    assert render._written == []
+
+def test_render_command(tmp_path, monkeypatch):
+    pytest.importorskip('mpl_toolkits.basemap')
+    import main
+    from utils import cache
+    monkeypatch.setattr(cache, '_default_cache', cache.ResultCache(str(tmp_path / 'cache')))
+    output = tmp_path / 'media'
+    main.main(['render', '--steps', '1000', '--station', 'England', '51.5', '0',
+        '--output', str(output), '--processes', '2'])
+    assert sorted(os.listdir(output)) == ['rk4j2_England_passes.png', 'rk4j2_ground_tracks_vs_vis.png']
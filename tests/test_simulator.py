@@ -0,0 +1,21 @@
+"""Checks that chunked propogation matches a single pass"""
+import os
+import numpy
+import pytest
+from config import data_path
+from models.spacecraft_state import SpacecraftState
+from scripts.generate_data import make_simulator
+
+def spacecraft():
+    with open(os.path.join(data_path, 'jason2.json')) as f:
+        return SpacecraftState.fromData(f)
+
+@pytest.mark.parametrize('name', ['kep', 'rk4j2', 'verlet', 'yoshida'])
+def test_chunks_match_single_pass(name):
+    n, dt = 1000, 10
+    simulator = make_simulator(name, spacecraft())
+    whole, = simulator.propogate_chunks(n, dt, chunk_size=n + 1)
+    chunks = list(simulator.propogate_chunks(n, dt, chunk_size=300))
+    assert len(chunks) == 4
+    numpy.testing.assert_array_equal(numpy.concatenate([chunk.times for chunk in chunks]), numpy.arange(n + 1) * dt)
+    numpy.testing.assert_allclose(numpy.concatenate([chunk.eci for chunk in chunks]), whole.eci, rtol=0, atol=1e-9)
@@ -0,0 +1,259 @@
+"""
+Content addressed cache for computed results. Keys are built from a canonical,
+full precision encoding of the parameters, together with the model version and
+the source of any code passed in, so results are neither recomputed needlessly
+nor served after the code which produced them has changed
+"""
+import functools
+import re
+
+# The names of the files written by ResultCache.filename, an optional name
+# prefix then the hex digest of the key
+_entry_name = re.compile(r'^(.+_)?[0-9a-f]{64}(\.trj|\.dat)$')
+
+class ResultCache:
+    """A directory of results bounded in size, evicting the least recently used
+    entries first. Results instances are stored in the memory mapped trajectory
+    format (see utils/trajectory_file.py) and anything else is pickled. Writes
+    are atomic, so several processes may share one cache. Only files named as
+    entries are counted, evicted or cleared, so any other files kept in the
+    directory are left alone"""
+
+    def __init__(self, path=None, max_bytes=None):
+        """
+        Input:
+            path - the cache directory, config.cache_path if None
+            max_bytes - the size bound of the cache, config.cache_max_bytes if None
+        """
+        from config import cache_path, cache_max_bytes
+        self._path = cache_path if path is None else path
+        self._max_bytes = cache_max_bytes if max_bytes is None else max_bytes
+        self._stats = {'hits': 0, 'misses': 0, 'writes': 0, 'evictions': 0}
+
+    @property
+    def path(self):
+        return self._path
+
+    @property
+    def max_bytes(self):
+        return self._max_bytes
+
+    @property
+    def stats(self):
+        """Returns a copy of the hit, miss, write and eviction counts"""
+        return dict(self._stats)
+
+    def key(self, params):
+        """Returns the hex digest identifying a list of parameters"""
+        import hashlib
+        from config import model_version
+        return hashlib.sha256(canonical([model_version, params])).hexdigest()
+
+    def filename(self, params, suffix='.dat'):
+        """Returns the file an entry is stored in, prefixed with the first
+        parameter when it is a name so that the cache stays browsable"""
+        import os
+        from utils.save_load import sanitise
+        prefix = sanitise(params[0]) + '_' if params and isinstance(params[0], str) else ''
+        return os.path.join(self._path, prefix + self.key(params) + suffix)
+
+    def get(self, params):
+        """Loads the entry for a list of parameters, Results are memory mapped
+        rather than read into memory
+        Output:
+            The loaded data, or None if there is no (readable) entry
+        """
+        import os
+        import pickle
+        from utils.instrumentation import timer
+        from utils.trajectory_file import read_results
+        trajectory = self.filename(params, '.trj')
+        fname = self.filename(params)
+        try:
+            with timer('cache'):
+                if os.path.isfile(trajectory):
+                    fname = trajectory
+                    obj = read_results(fname)
+                else:
+                    with open(fname, 'rb') as f:
+                        obj = pickle.load(f)
+        except FileNotFoundError:
+            self._stats['misses'] += 1
+            return None
+        except (ValueError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            # Entries which can no longer be read are treated as missing
+            self._remove(fname)
+            self._stats['misses'] += 1
+            return None
+        # Marks the entry as recently used for eviction
+        try:
+            os.utime(fname)
+        except OSError:
+            pass
+        self._stats['hits'] += 1
+        return obj
+
+    def put(self, params, obj):
+        """Saves an object as the entry for a list of parameters, then evicts
+        old entries if the cache exceeds its size bound"""
+        import os
+        import pickle
+        import tempfile
+        from models.results import Results
+        from utils.instrumentation import timer
+        from utils.trajectory_file import write_results
+        os.makedirs(self._path, exist_ok=True)
+        with timer('cache'):
+            if isinstance(obj, Results):
+                write_results(obj, self.filename(params, '.trj'))
+            else:
+                fd, temporary = tempfile.mkstemp(dir=self._path, suffix='.tmp')
+                try:
+                    with os.fdopen(fd, 'wb') as f:
+                        pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+                    os.replace(temporary, self.filename(params))
+                except BaseException:
+                    self._remove(temporary)
+                    raise
+        self._stats['writes'] += 1
+        self.evict()
+
+    def evict(self):
+        """Removes the least recently used entries until the cache fits within
+        max_bytes. The most recent entry is always kept"""
+        entries = []
+        for entry in self._entries():
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        for _, size, fname in entries[:-1]:
+            if total <= self._max_bytes:
+                break
+            self._remove(fname)
+            total -= size
+            self._stats['evictions'] += 1
+
+    def clear(self):
+        """Removes every entry from the cache"""
+        for entry in self._entries():
+            self._remove(entry.path)
+
+    def _entries(self):
+        import os
+        try:
+            return [entry for entry in os.scandir(self._path)
+                if entry.is_file() and _entry_name.match(entry.name)]
+        except FileNotFoundError:
+            return []
+
+    def _remove(self, fname):
+        import os
+        try:
+            os.remove(fname)
+        except FileNotFoundError:
+            pass
+
+def canonical(obj):
+    """Encodes an object as bytes for use in a cache key. Floats and arrays are
+    encoded at full precision, and functions by name and the source of their
+    module and the project modules it imports (see code_version), so that a
+    change to the code changes the key
+
+    Input:
+        obj - None, bool, int, float, str, datetime, numpy array or scalar, list,
+            tuple, dict, function, or an object with a cache_key method
+    Output:
+        bytes
+    """
+    import datetime
+    import numpy
+    if obj is None or isinstance(obj, (bool, str)):
+        return '{}:{!r}'.format(type(obj).__name__, obj).encode()
+    if isinstance(obj, (int, float)):
+        # Numerically equal ints and floats (a dt of 10 or 10.0) share a key
+        if isinstance(obj, int) and float(obj) != obj:
+            return 'int:{!r}'.format(obj).encode()
+        return b'float:' + float(obj).hex().encode()
+    if isinstance(obj, numpy.generic):
+        return canonical(obj.item())
+    if isinstance(obj, numpy.ndarray):
+        array = numpy.ascontiguousarray(obj)
+        return b'ndarray:' + '{}{}'.format(array.dtype.str, array.shape).encode() + array.tobytes()
+    if isinstance(obj, (datetime.datetime, datetime.date)):
+        return b'datetime:' + obj.isoformat().encode()
+    if isinstance(obj, (list, tuple)):
+        return b'[' + b','.join(canonical(item) for item in obj) + b']'
+    if isinstance(obj, dict):
+        return b'{' + b','.join(canonical(key) + b':' + canonical(obj[key])
+            for key in sorted(obj, key=repr)) + b'}'
+    if hasattr(obj, 'cache_key'):
+        return b'key:' + canonical(obj.cache_key())
+    if isinstance(obj, functools.partial):
+        return b'partial:' + canonical([obj.func, list(obj.args), dict(obj.keywords)])
+    if callable(obj) and hasattr(obj, '__qualname__'):
+        return b'code:' + '{}.{}:{}'.format(obj.__module__, obj.__qualname__, code_version(obj)).encode()
+    raise TypeError('Cannot build a cache key from {!r}'.format(obj))
+
+def code_version(function):
+    """Returns a digest of the source of the module defining a function and of
+    every project module it imports, directly or through other project modules,
+    so that a change to shared code (such as propogators/gravity.py) changes
+    the key. Imports are read from the source, including those made within
+    functions, and modules outside the project are not included"""
+    return _module_version(function.__module__)
+
+@functools.lru_cache(maxsize=None)
+def _module_version(module_name):
+    import hashlib
+    digest = hashlib.sha256()
+    for name in sorted(_project_modules(module_name)):
+        with open(_module_file(name), 'rb') as f:
+            digest.update(name.encode() + b'\0' + f.read() + b'\0')
+    return digest.hexdigest()[:16]
+
+def _project_modules(module_name):
+    """Returns the set of project modules reachable by import from a module"""
+    import ast
+    found = set()
+    pending = [module_name]
+    while pending:
+        name = pending.pop()
+        fname = _module_file(name)
+        if name in found or fname is None:
+            continue
+        found.add(name)
+        try:
+            with open(fname, 'rb') as f:
+                tree = ast.parse(f.read(), fname)
+        except (OSError, SyntaxError, ValueError):
+            continue
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                pending.extend(alias.name for alias in node.names)
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                pending.append(node.module)
+                # from package import module
+                pending.extend(node.module + '.' + alias.name for alias in node.names)
+    return found
+
+@functools.lru_cache(maxsize=None)
+def _module_file(module_name):
+    """Returns the source file of a module if it is part of the project, or
+    None. Modules are looked up under config.root_path rather than imported"""
+    import os
+    from config import root_path
+    fname = os.path.join(root_path, *module_name.split('.')) + '.py'
+    return fname if os.path.isfile(fname) else None
+
+_default_cache = None
+
+def default_cache():
+    """Returns the cache shared by the application, at config.cache_path"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ResultCache()
+    return _default_cache
@@ -0,0 +1,152 @@
+"""
+Opt-in instrumentation of the hot paths. Phases (propogate, frame_conversion,
+visibility, passes, cache, plotting) are timed, events are counted, and the
+peak traced memory of each phase is recorded, all into module level registries
+which report() gathers. Until enable() is called every hook is a no-op, so
+instrumented code pays only a flag check.
+
+Phases may nest, and the times and peaks of enclosing phases include those of
+the phases within them. Only the current process is recorded, work done in the
+workers of utils.parallel.run_simulations is not
+"""
+import contextlib
+import functools
+
+_state = {'enabled': False, 'trace_memory': False}
+# phase -> [seconds, calls]
+_timers = {}
+_counters = {}
+# phase -> peak traced bytes
+_peaks = {}
+# The phases currently being timed, innermost last
+_open = []
+_disabled = contextlib.nullcontext()
+
+def enable(trace_memory=False):
+    """Starts recording
+    Input:
+        trace_memory - if True the peak memory of each phase is traced with
+            tracemalloc, which slows allocation heavy code
+    """
+    _state['enabled'] = True
+    if trace_memory:
+        import tracemalloc
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        _state['trace_memory'] = True
+
+def disable():
+    """Stops recording, keeping what has been recorded so far"""
+    _state['enabled'] = False
+    if _state['trace_memory']:
+        import tracemalloc
+        tracemalloc.stop()
+        _state['trace_memory'] = False
+
+def enabled():
+    return _state['enabled']
+
+def reset():
+    """Discards everything recorded so far"""
+    _timers.clear()
+    _counters.clear()
+    _peaks.clear()
+
+def count(name, n=1):
+    """Adds n to the counter name"""
+    if _state['enabled']:
+        _counters[name] = _counters.get(name, 0) + n
+
+def timer(phase):
+    """Returns a context manager timing the enclosed block as part of phase"""
+    if not _state['enabled']:
+        return _disabled
+    return _timed_block(phase)
+
+def timed(phase):
+    """Decorates a function so that each call is timed as part of phase"""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with timer(phase):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+@contextlib.contextmanager
+def _timed_block(phase):
+    import time
+    trace_memory = _state['trace_memory']
+    if trace_memory:
+        import tracemalloc
+        # The peak so far belongs to the enclosing phases, before it is reset
+        _record_peak(_open, tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+    _open.append(phase)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        _open.pop()
+        totals = _timers.setdefault(phase, [0.0, 0])
+        totals[0] += elapsed
+        totals[1] += 1
+        if trace_memory and _state['trace_memory']:
+            _record_peak(_open + [phase], tracemalloc.get_traced_memory()[1])
+
+def _record_peak(phases, peak):
+    for phase in phases:
+        _peaks[phase] = max(_peaks.get(phase, 0), peak)
+
+def max_rss():
+    """Returns the high-water mark of the resident memory of the process (bytes),
+    or None where it is unavailable"""
+    import sys
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS and kilobytes elsewhere
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+def report():
+    """Gathers everything recorded so far
+    Output:
+        a dict of
+            timers - {phase: {'seconds': total time, 'calls': number of blocks}}
+            counters - {name: count}
+            memory - the max_rss of the process (bytes) and the peak traced
+                bytes of each phase, if memory was traced
+            cache - the hit, miss, write and eviction counts of the result cache
+    """
+    from utils.cache import default_cache
+    return {
+        'timers': {phase: {'seconds': seconds, 'calls': calls}
+            for phase, (seconds, calls) in _timers.items()},
+        'counters': dict(_counters),
+        'memory': {'max_rss': max_rss(), 'peaks': dict(_peaks)},
+        'cache': default_cache().stats,
+    }
+
+def print_report(data=None):
+    """Prints a report (see report) as tables"""
+    data = report() if data is None else data
+    print('{:<24} {:>12} {:>10} {:>14}'.format('phase', 'seconds', 'calls', 'peak (MiB)'))
+    for phase, timing in sorted(data['timers'].items(), key=lambda item: -item[1]['seconds']):
+        peak = data['memory']['peaks'].get(phase)
+        print('{:<24} {:>12.4f} {:>10} {:>14}'.format(phase, timing['seconds'], timing['calls'],
+            '-' if peak is None else '{:.1f}'.format(peak / 2**20)))
+    for name, value in sorted(list(data['counters'].items()) + [('cache_' + name, value)
+            for name, value in data['cache'].items()]):
+        print('{:<24} {:>12}'.format(name, value))
+    if data['memory']['max_rss'] is not None:
+        print('{:<24} {:>12.1f}'.format('max_rss (MiB)', data['memory']['max_rss'] / 2**20))
+
+def write_report(fname, data=None):
+    """Writes a report (see report) to fname as JSON"""
+    import json
+    data = report() if data is None else data
+    with open(fname, 'w') as f:
+        json.dump(data, f, indent=2, sort_keys=True)
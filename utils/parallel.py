@@ -0,0 +1,30 @@
+"""
+Process pool execution of independent propogation jobs. Each job runs through
+Simulator.propogate_in_period in a worker, so results are written to the shared
+result cache by the worker that computed them (cache writes are atomic, see
+utils/cache.py) and are returned in the order the jobs were given
+"""
+
+def run_simulations(jobs, processes=None):
+    """Runs independent Simulator jobs across a pool of worker processes
+    Input:
+        jobs - a list of (Simulator, n, dt) tuples
+        processes - the number of worker processes, os.cpu_count() if None,
+            jobs are run in this process if 1
+    Output:
+        results - a list of Results, in the order of jobs
+    """
+    import os
+    from multiprocessing import Pool
+    jobs = list(jobs)
+    processes = min(processes or os.cpu_count() or 1, len(jobs))
+    if processes <= 1:
+        return [run_simulation(job) for job in jobs]
+    with Pool(processes) as pool:
+        # One job per task so that long and short jobs balance across workers
+        return pool.map(run_simulation, jobs, chunksize=1)
+
+def run_simulation(job):
+    """Runs a single (Simulator, n, dt) job"""
+    simulator, n, dt = job
+    return simulator.propogate_in_period(n, dt)
@@ -1,34 +1,23 @@
 def save(params, obj):
-    """Saves an object with a filename based on a list of parameters given
+    """Saves an object to the result cache under a list of parameters
     Input:
-        params - a list of items with the string method implemented (used as the name)
+        params - a list of parameters which identify the object (see utils.cache.canonical)
         obj - the item to save
     Output:
-        - Side effect: an item will be saved at pickle_path with a hash based on the params
+        - Side effect: an item will be saved in the cache at config.cache_path
     """
-    import pickle
-    from config import pickle_path
-    hsh = sanitise("_".join([str(param) for param in params]))
-    fname = "{}/{}.dat".format(pickle_path, hsh)
-    pickle.dump(obj, open(fname, 'wb'))
+    from utils.cache import default_cache
+    default_cache().put(params, obj)
 
 def load(params):
-    """Loads an object using a filename based on a list of parameters given
+    """Loads an object from the result cache using a list of parameters
         Input:
-            params - a list of items with the string method implemented (used as the name)
+            params - a list of parameters which identify the object (see utils.cache.canonical)
         Output:
             The loaded data, or None if it fails
     """
-    import os
-    import pickle
-    from config import pickle_path
-    hsh = sanitise("_".join([str(param) for param in params]))
-    fname = "{}/{}.dat".format(pickle_path, hsh)
-    print(fname)
-    if os.path.isfile(fname):
-        print('loaded {}'.format(fname))
-        return pickle.load(open(fname, 'rb'))
-    return None
+    from utils.cache import default_cache
+    return default_cache().get(params)
 
 def sanitise(string):
     """Removes characters from a string which would interfere with unix compliant path specifications"""
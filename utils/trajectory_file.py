@@ -0,0 +1,100 @@
+"""
+Binary on-disk format for Results which can be opened with memory mapping.
+
+A file is laid out as
+    magic - 8 bytes, b'SSIMTRJ1'
+    header length - little endian uint64
+    header - JSON (pname, delta, epoch, n), padded so the data is 64 byte aligned
+    states - n x 6 little endian float64, x, y, z (km), u, v, w (km/s)
+    times - n little endian float64, times from epoch (s)
+so that any window of states can be read without touching the rest of the file,
+and several processes opening the same file share its pages
+"""
+
+magic = b'SSIMTRJ1'
+alignment = 64
+epoch_format = '%Y-%m-%dT%H:%M:%S.%f'
+
+def write_results(results, fname):
+    """Writes a Results instance to fname, replacing any existing file atomically
+    Input:
+        results - a Results instance
+        fname - the file to write
+    """
+    import json
+    import os
+    import struct
+    import tempfile
+    from numpy import ascontiguousarray
+
+    states = ascontiguousarray(results.eci, dtype='<f8')
+    times = ascontiguousarray(results.times, dtype='<f8')
+    header = json.dumps({
+        'pname': results.pname,
+        'delta': results.delta,
+        'epoch': results.epoch.strftime(epoch_format),
+        'n': len(states),
+    }).encode()
+    prefix = len(magic) + 8
+    header = header.ljust(-(-(prefix + len(header)) // alignment) * alignment - prefix)
+
+    directory = os.path.dirname(os.path.abspath(fname))
+    fd, temporary = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(magic)
+            f.write(struct.pack('<Q', len(header)))
+            f.write(header)
+            f.write(states.tobytes())
+            f.write(times.tobytes())
+        os.replace(temporary, fname)
+    except BaseException:
+        os.remove(temporary)
+        raise
+
+def read_header(fname):
+    """Reads the header of a trajectory file
+    Output:
+        header - a dict of pname, delta, epoch (datetime), n and the data offsets
+    """
+    import json
+    import struct
+    from datetime import datetime
+    with open(fname, 'rb') as f:
+        if f.read(len(magic)) != magic:
+            raise ValueError('{} is not a trajectory file'.format(fname))
+        length, = struct.unpack('<Q', f.read(8))
+        header = json.loads(f.read(length).decode())
+    header['epoch'] = datetime.strptime(header['epoch'], epoch_format)
+    header['states_offset'] = len(magic) + 8 + length
+    header['times_offset'] = header['states_offset'] + header['n'] * 6 * 8
+    return header
+
+def read_results(fname, start=None, end=None):
+    """Opens a trajectory file as a Results instance backed by memory mapped,
+    read-only arrays, optionally restricted to a window of time
+
+    Input:
+        fname - the file to open
+        start - the earliest time from epoch to include (s), from the first state if None
+        end - the latest time from epoch to include (s), to the last state if None
+
+    Output:
+        results - a Results instance, whose times remain relative to the original epoch
+    """
+    from numpy import empty, memmap, searchsorted
+    from models.results import Results
+    header = read_header(fname)
+    n = header['n']
+    times = memmap(fname, dtype='<f8', mode='r', offset=header['times_offset'], shape=(n,))
+    first = 0 if start is None else int(searchsorted(times, start, side='left'))
+    last = n if end is None else int(searchsorted(times, end, side='right'))
+    last = max(first, last)
+    if last == first:
+        # numpy cannot map an empty region
+        states = empty((0, 6))
+    else:
+        states = memmap(fname, dtype='<f8', mode='r',
+            offset=header['states_offset'] + first * 6 * 8, shape=(last - first, 6))
+    return Results(states, header['delta'], header['epoch'], header['pname'],
+        times=times[first:last])
@@ -0,0 +1,80 @@
+"""
+Reports the drift of the quantities conserved by the gravity models, as a check
+on integrators over long arcs. Under a point mass the specific energy and the
+angular momentum vector are conserved, under the zonal models (which are
+symmetric about the z axis) only the energy and the z component of the angular
+momentum are
+"""
+
+def specific_energy(states, degree=2):
+    """Calculates the specific orbital energy of each state
+    Input:
+        states - an (N, 6) array of x, y, z (Km), u, v, w (Km/s) in eci
+        degree - the highest zonal degree of the gravity model, 0 for a point mass
+    Output:
+        energy - an (N,) array (Km^2/s^2)
+    """
+    from numpy import asarray
+    from propogators.gravity import potential
+    states = asarray(states, dtype=float)
+    return (states[:, 3:]**2).sum(axis=1) / 2 + potential(states[:, :3], degree)
+
+def angular_momentum(states):
+    """Calculates the specific angular momentum of each state
+    Input:
+        states - an (N, 6) array of x, y, z (Km), u, v, w (Km/s) in eci
+    Output:
+        h - an (N, 3) array (Km^2/s)
+    """
+    from numpy import asarray, cross
+    states = asarray(states, dtype=float)
+    return cross(states[:, :3], states[:, 3:])
+
+def drift(values, times):
+    """Measures the change of a conserved quantity relative to its initial value
+    Input:
+        values - an (N,) array of the quantity
+        times - an (N,) array of times (s)
+    Output:
+        max - the largest relative deviation from the initial value
+        final - the relative deviation at the last time
+        slope - the least squares rate of relative deviation (per day)
+    """
+    from numpy import abs, asarray, polyfit
+    values = asarray(values, dtype=float)
+    times = asarray(times, dtype=float)
+    relative = (values - values[0]) / abs(values[0])
+    slope = polyfit(times / 86400, relative, 1)[0] if len(values) > 1 else 0.0
+    return {'max': abs(relative).max(), 'final': relative[-1], 'slope': slope}
+
+def conservation_report(results, degree=2):
+    """Measures the drift of the energy and conserved angular momentum along
+    a propogated orbit
+    Input:
+        results - a Results instance
+        degree - the highest zonal degree of the gravity model the orbit was
+            propogated under, 0 for a point mass
+    Output:
+        a dict of the pname, and the drift (see drift) of the energy and the
+        angular momentum, its magnitude for a point mass, otherwise its z component
+    """
+    from numpy.linalg import norm
+    h = angular_momentum(results.eci)
+    h = norm(h, axis=1) if degree < 2 else h[:, 2]
+    return {
+        'pname': results.pname,
+        'energy': drift(specific_energy(results.eci, degree), results.times),
+        'angular_momentum': drift(h, results.times),
+    }
+
+def print_conservation_report(results_list, degree=2):
+    """Prints the drift of energy and angular momentum for several orbits, one
+    line per orbit"""
+    print('{:>12} {:>12} {:>14} {:>12} {:>14}'.format(
+        'pname', 'max dE/E', 'dE/E per day', 'max dh/h', 'dh/h per day'))
+    for results in results_list:
+        report = conservation_report(results, degree)
+        energy = report['energy']
+        momentum = report['angular_momentum']
+        print('{:>12} {:>12.3e} {:>14.3e} {:>12.3e} {:>14.3e}'.format(report['pname'],
+            energy['max'], energy['slope'], momentum['max'], momentum['slope']))
@@ -1,21 +1,26 @@
 """
 Module which implements comparison between different orbital trajectories
+
+Differences are returned as (N, 3) arrays, one row per sample. Their summary
+statistics (see DifferenceStatistics) are accumulated incrementally, so that
+streams of results chunks can be compared without holding whole orbits
 """
 
 def orbit_differences(seriesA, seriesB):
   """
-  Returns a list composed from two input lists where each element at
+  Returns an array composed from two input series where each element at
   index i is the difference of the elements at i for seriesA, and
   seriesB
 
   Input
-  seriesA - input list of values
-  seriesB - input list of values
+  seriesA - input (N, 3) array or list of vectors
+  seriesB - input (N, 3) array or list of vectors
 
   Output
-  List of element differences of seriesA - seriesB
+  (N, 3) array of element differences of seriesA - seriesB
   """
-  return [a - b for a, b in zip(seriesA, seriesB)]
+  from numpy import asarray
+  return asarray(seriesA, dtype=float) - asarray(seriesB, dtype=float)
 
 def orbit_differences_rv(seriesA, seriesB):
   """
@@ -28,8 +33,8 @@ def orbit_differences_rv(seriesA, seriesB):
   seriesB - input list of (R, V) vectors
 
   Output
-  List of element differences of seriesA - seriesB for the R vectors
-  only
+  (N, 3) array of element differences of seriesA - seriesB for the R
+  vectors only
   """
   return orbit_differences(extract_r(seriesA), extract_r(seriesB))
 
@@ -41,28 +46,22 @@ def orbit_difference_hcl(orbita, orbitb):
   respect to orbita.
 
   Inputs:
-  orbita - A list of (R, V) tuples describing an orbit in the eci basis
-  orbitb - A list of (R, V) tuples describing an orbit in the eci basis
+  orbita - A Results instance describing an orbit in the eci basis
+  orbitb - A Results instance describing an orbit in the eci basis
 
   Outputs:
-  x_h - A list of differences in the height direction
-  x_c - A list of differences in the cross-track direction
-  x_l - A list of differences in the along-track direction
+  An (N, 3) array of the differences in the height, cross-track and
+  along-track directions
 
-  All output lists are in order (that is if the eci orbits given are a
-  time series, then the outputs will be in the same time series)
+  The rows are in order (that is if the eci orbits given are a time
+  series, then the output will be in the same time series)
   """
+  from numpy import einsum, stack
   from basis_converters.from_eci import eci_to_hcl_basis
-  from numpy import dot
-  x_h = []
-  x_c = []
-  x_l = []
-  for base, difference in zip(orbita.eci, orbit_differences_rv(orbita.eci, orbitb.eci)):
-    h, c, l = eci_to_hcl_basis(base)
-    x_h.append(dot(difference, h))
-    x_c.append(dot(difference, c))
-    x_l.append(dot(difference, l))
-  return (x_h, x_c, x_l)
+  difference = orbit_differences(orbita.eci_r, orbitb.eci_r)
+  # (N, 3, 3), the h, c and l vectors of each sample as rows
+  basis = stack(eci_to_hcl_basis(orbita.eci), axis=1)
+  return einsum('nij,nj->ni', basis, difference)
 
 
 
@@ -72,16 +71,235 @@ def orbit_difference_topo(orbita, orbitb, gs):
   topocentric basis
 
   Inputs:
-  orbita - A list of R vectors describing an orbit in the ecef basis
-  orbitb - A list of R vectors describing an orbit in the ecef basis
+  orbita - An (N, 3) array of R vectors describing an orbit in the ecef basis
+  orbitb - An (N, 3) array of R vectors describing an orbit in the ecef basis
+  gs - A GroundStation object from which enu vectors can be obtained
+
+  Outputs:
+  An (N, 3) array of the differences in the east, north and up directions
+  """
+  from numpy import array
+  return orbit_differences(orbita, orbitb) @ array(gs.enu).T
+
+def orbit_difference_hcl_chunks(chunks_a, chunks_b):
+  """
+  Calculates orbit differences in the hcl basis between two streams of
+  results chunks (see Simulator.propogate_chunks), yielding the
+  differences for each pair of chunks in turn
+
+  Inputs:
+  chunks_a - An iterable of Results chunks
+  chunks_b - An iterable of Results chunks covering the same times
+
+  Outputs:
+  yields an (M, 3) array for each chunk, as for orbit_difference_hcl
+  """
+  for orbita, orbitb in zip(chunks_a, chunks_b):
+    yield orbit_difference_hcl(orbita, orbitb)
+
+def orbit_difference_topo_chunks(chunks_a, chunks_b, gs):
+  """
+  Calculates orbit differences in the topocentric basis between two
+  streams of results chunks, yielding the differences for each pair of
+  chunks in turn
+
+  Inputs:
+  chunks_a - An iterable of Results chunks
+  chunks_b - An iterable of Results chunks covering the same times
   gs - A GroundStation object from which enu vectors can be obtained
+
+  Outputs:
+  yields an (M, 3) array for each chunk, as for orbit_difference_topo
+  """
+  for orbita, orbitb in zip(chunks_a, chunks_b):
+    yield orbit_difference_topo(orbita.ecef_r, orbitb.ecef_r, gs)
+
+class DifferenceStatistics:
+  """
+  Accumulates the RMS, the largest magnitude and the least squares drift
+  rate of each component of a series of differences, one chunk at a
+  time. Chunks are merged with the pairwise update of means and
+  co-moments, so the result does not depend on how the series is split
+  and does not lose precision over long series. For hcl differences the
+  drift rate of the third component is the along-track drift
   """
-  from numpy import dot
-  e, n, u = gs.enu
-  x_e = [dot(x, e) for x in orbit_differences(orbita, orbitb)]
-  x_n = [dot(x, n) for x in orbit_differences(orbita, orbitb)]
-  x_u = [dot(x, u) for x in orbit_differences(orbita, orbitb)]
-  return (x_e, x_n, x_u)
+  def __init__(self):
+    from numpy import zeros
+    self._count = 0
+    self._sum_squares = zeros(3)
+    self._max = zeros(3)
+    self._mean_time = 0.0
+    self._mean = zeros(3)
+    # Sums of squared deviations of the times, and of the products of the
+    # deviations of the times and the differences
+    self._time_moment = 0.0
+    self._co_moment = zeros(3)
+
+  def update(self, differences, times):
+    """
+    Adds a chunk of differences
+
+    Inputs:
+    differences - An (M, 3) array of differences (km)
+    times - An (M,) array of the times of the differences (s)
+
+    Outputs:
+    self, so that updates may be chained
+    """
+    from numpy import abs, asarray, maximum
+    differences = asarray(differences, dtype=float).reshape(-1, 3)
+    times = asarray(times, dtype=float) / 86400
+    m = len(differences)
+    if m == 0:
+      return self
+    mean_time = times.mean()
+    mean = differences.mean(axis=0)
+    time_deviation = times - mean_time
+    time_moment = time_deviation @ time_deviation
+    co_moment = time_deviation @ (differences - mean)
+
+    n = self._count + m
+    delta_time = mean_time - self._mean_time
+    delta = mean - self._mean
+    weight = self._count * m / n
+    self._mean_time += delta_time * m / n
+    self._mean += delta * m / n
+    self._time_moment += time_moment + delta_time * delta_time * weight
+    self._co_moment += co_moment + delta_time * delta * weight
+    self._count = n
+    self._sum_squares += (differences * differences).sum(axis=0)
+    self._max = maximum(self._max, abs(differences).max(axis=0))
+    return self
+
+  @property
+  def count(self):
+    return self._count
+
+  @property
+  def rms(self):
+    """Returns the root mean square of each component (km)"""
+    return (self._sum_squares / max(self._count, 1))**0.5
+
+  @property
+  def rms_norm(self):
+    """Returns the root mean square of the magnitude of the differences (km)"""
+    return (self._sum_squares.sum() / max(self._count, 1))**0.5
+
+  @property
+  def max(self):
+    """Returns the largest magnitude of each component (km)"""
+    return self._max.copy()
+
+  @property
+  def drift_rate(self):
+    """Returns the least squares rate of change of each component (km per
+    day), zero until the times span an interval"""
+    from numpy import zeros
+    if self._time_moment == 0:
+      return zeros(3)
+    return self._co_moment / self._time_moment
+
+  def summary(self):
+    """Returns a dict of the count, and the rms, rms_norm, max and
+    drift_rate as above"""
+    return {
+      'count': self._count,
+      'rms': self.rms,
+      'rms_norm': self.rms_norm,
+      'max': self.max,
+      'drift_rate': self.drift_rate,
+    }
+
+def difference_statistics(differences, times):
+  """
+  Summarises a whole series of differences at once
+
+  Inputs:
+  differences - An (N, 3) array of differences (km)
+  times - An (N,) array of the times of the differences (s)
+
+  Outputs:
+  A DifferenceStatistics instance
+  """
+  return DifferenceStatistics().update(differences, times)
+
+def difference_statistics_chunks(chunks_a, chunks_b, basis='hcl', gs=None):
+  """
+  Summarises the differences between two streams of results chunks
+  without holding more than a chunk of either
+
+  Inputs:
+  chunks_a - An iterable of Results chunks
+  chunks_b - An iterable of Results chunks covering the same times
+  basis - 'hcl' or 'topo'
+  gs - the GroundStation of the topocentric basis
+
+  Outputs:
+  A DifferenceStatistics instance
+  """
+  statistics = DifferenceStatistics()
+  for orbita, orbitb in zip(chunks_a, chunks_b):
+    statistics.update(_difference(orbita, orbitb, basis, gs), orbita.times)
+  return statistics
+
+def compare_all(orbits, reference=None, basis='hcl', gs=None):
+  """
+  Compares several orbits in one call, either each against a reference
+  or, without one, every pair. Orbits sampled at other times than the
+  reference (for example with another step size) are compared at their
+  own times, against the reference interpolated with Results.interpolate,
+  so the reference should be the most finely sampled
+
+  Inputs:
+  orbits - A list of Results instances
+  reference - A Results instance, or None to compare every pair
+  basis - 'hcl', differences in the hcl basis of the reference (or the
+    first of each pair), or 'topo', in the enu basis of gs
+  gs - the GroundStation of the topocentric basis
+
+  Outputs:
+  A list of (orbit, reference, DifferenceStatistics) of the differences
+  orbit - reference, where for pairs the first orbit in orbits is the
+  reference
+  """
+  from itertools import combinations
+  if reference is None:
+    pairs = [(orbitb, orbita) for orbita, orbitb in combinations(orbits, 2)]
+  else:
+    pairs = [(orbit, reference) for orbit in orbits]
+  comparisons = []
+  for orbit, base in pairs:
+    aligned = _aligned(base, orbit.times)
+    differences = -_difference(aligned, orbit, basis, gs)
+    comparisons.append((orbit, base, difference_statistics(differences, orbit.times)))
+  return comparisons
+
+def print_comparisons(comparisons, labels=('h', 'c', 'l')):
+  """Prints the RMS, largest difference and drift rate of each component
+  for the output of compare_all, one line per comparison"""
+  print('{:>12} {:>12} {:>8}'.format('orbit', 'reference', 'dt') + ''.join(
+    ' {:>10} {:>10} {:>12}'.format('rms ' + label, 'max ' + label, label + ' per day')
+    for label in labels))
+  for orbit, reference, statistics in comparisons:
+    print('{:>12} {:>12} {:>8g}'.format(orbit.pname, reference.pname, orbit.delta) + ''.join(
+      ' {:>10.4g} {:>10.4g} {:>12.4g}'.format(rms, largest, rate) for rms, largest, rate
+      in zip(statistics.rms, statistics.max, statistics.drift_rate)))
+
+def _aligned(results, times):
+  """Returns results, or results interpolated at times if they are sampled
+  at other times"""
+  from numpy import array_equal
+  from models.results import Results
+  if array_equal(results.times, times):
+    return results
+  return Results(results.interpolate(times), results.delta, results.epoch, results.pname, times=times)
+
+def _difference(orbita, orbitb, basis, gs):
+  if basis == 'hcl':
+    return orbit_difference_hcl(orbita, orbitb)
+  if basis == 'topo':
+    return orbit_difference_topo(orbita.ecef_r, orbitb.ecef_r, gs)
+  raise ValueError('Unknown basis {!r}, expected hcl or topo'.format(basis))
 
 def extract_r(eci):
   return [r for r, _ in eci]